@@ -5,13 +5,30 @@ Main entry point for HDL Parser and Testing Framework
 Run this to test your HDL chips against test vectors.
 """
 
-import argparse
 import os
 import sys
-import unittest
-from typing import List, Tuple
-from src.hdl_parser import HDLParser
-from src.tester import ChipTester
+from types import SimpleNamespace
+from typing import Dict, List, Set, Tuple
+
+
+# Directory -> names of its entries, from one scandir per directory
+_EXISTS_CACHE: Dict[str, Set[str]] = {}
+
+
+def _path_exists(path: str) -> bool:
+    """Check that a file exists using a cached listing of its directory."""
+    parent, name = os.path.split(os.path.abspath(path))
+    entries = _EXISTS_CACHE.get(parent)
+    if entries is None:
+        try:
+            with os.scandir(parent) as scan:
+                entries = {entry.name for entry in scan}
+        except OSError:
+            return os.path.exists(path)
+        _EXISTS_CACHE[parent] = entries
+    
+    # Not listed can still mean it exists (e.g. case-insensitive filesystems)
+    return name in entries or os.path.exists(path)
 
 
 def validate_file_pairs(files: List[str]) -> List[Tuple[str, str]]:
@@ -27,13 +44,7 @@ def validate_file_pairs(files: List[str]) -> List[Tuple[str, str]]:
         hdl_file = files[i]
         test_file = files[i + 1]
         
-        # Check files exist
-        if not os.path.exists(hdl_file):
-            raise FileNotFoundError(f"HDL file not found: {hdl_file}")
-        if not os.path.exists(test_file):
-            raise FileNotFoundError(f"Test file not found: {test_file}")
-        
-        # Check file extensions
+        # Check file extensions (cheap, so before touching the filesystem)
         if not hdl_file.endswith('.hdl'):
             raise ValueError(f"Expected HDL file (.hdl), got: {hdl_file}")
         if not test_file.endswith('.tst'):
@@ -41,25 +52,39 @@ def validate_file_pairs(files: List[str]) -> List[Tuple[str, str]]:
         
         pairs.append((hdl_file, test_file))
     
+    # Check files exist
+    for hdl_file, test_file in pairs:
+        if not _path_exists(hdl_file):
+            raise FileNotFoundError(f"HDL file not found: {hdl_file}")
+        if not _path_exists(test_file):
+            raise FileNotFoundError(f"Test file not found: {test_file}")
+    
     return pairs
 
 
 def validate_hdl_files(hdl_files: List[str]) -> None:
-    """Parse HDL files to make sure they're valid before testing."""
-    parser = HDLParser()
+    """
+    Parse HDL files to make sure they're valid before testing.
+    Goes through the simulator's definition cache, so the simulator reuses
+    these parses instead of reading each file again.
+    """
+    from src.chip_simulator import load_chip_definition
     
     print("Validating HDL files...")
     for hdl_file in hdl_files:
         try:
-            chip_def = parser.parse_file(hdl_file)
+            chip_def = load_chip_definition(hdl_file)
             print(f"✓ Successfully parsed {hdl_file} (chip: {chip_def.name})")
         except Exception as e:
             print(f"✗ Failed to parse {hdl_file}: {e}")
             sys.exit(1)
 
 
-def run_tests(file_pairs: List[Tuple[str, str]], verbose: bool = True) -> bool:
+def run_tests(file_pairs: List[Tuple[str, str]], verbose: bool = True,
+              jobs: int = 1, trace: bool = True) -> bool:
     """Run tests for all chip pairs and return True if all passed."""
+    from src.tester import ChipTester
+    
     # Figure out base directory from the first HDL file
     # This is important so the simulator can find referenced chips
     if file_pairs:
@@ -79,52 +104,114 @@ def run_tests(file_pairs: List[Tuple[str, str]], verbose: bool = True) -> bool:
     if len(file_pairs) == 1:
         # Single chip test
         hdl_file, test_file = file_pairs[0]
-        results, stats = tester.run_test_file(test_file, verbose)
+        results, stats = tester.run_test_file(test_file, verbose, trace)
         return stats['passed'] == stats['total']
     else:
-        # Multiple chips
-        all_results = tester.run_multiple_tests(file_pairs, verbose)
+        # Multiple chips (the tester prints the overall summary)
+        all_results = tester.run_multiple_tests(file_pairs, verbose, jobs, trace)
         
         # Check if all tests passed
-        total_passed = sum(stats['passed'] for stats in all_results.values())
-        total_tests = sum(stats['total'] for stats in all_results.values())
-        
-        return total_passed == total_tests
+        return all(stats['passed'] == stats['total'] for stats in all_results.values())
+
 
+def _iter_tests(suite):
+    """Yield every test case in a (nested) unittest suite."""
+    for item in suite:
+        if hasattr(item, '__iter__'):
+            yield from _iter_tests(item)
+        else:
+            yield item
 
-def run_all_tests():
-    """Run all unit tests in the tests/ directory."""
+
+def _run_test_shard(shard: int, shard_count: int) -> Tuple[int, int, int, bool, str]:
+    """
+    Run one shard of the unit tests in a worker process.
+    Every worker discovers the same tests and keeps every shard_count-th
+    test class, so test classes are never split between processes.
+    """
+    import io
+    import unittest
+    
+    tests = list(_iter_tests(unittest.TestLoader().discover('tests', pattern='test_*.py')))
+    class_of = lambda test: f"{type(test).__module__}.{type(test).__qualname__}"
+    classes = list(dict.fromkeys(class_of(test) for test in tests))
+    shard_classes = set(classes[shard::shard_count])
+    suite = unittest.TestSuite(test for test in tests if class_of(test) in shard_classes)
+    
+    stream = io.StringIO()
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(suite)
+    return (result.testsRun, len(result.failures), len(result.errors),
+            result.wasSuccessful(), stream.getvalue())
+
+
+def run_all_tests(jobs: int = 1):
+    """Run all unit tests in the tests/ directory, optionally in several processes."""
     print("Running all unit and integration tests...\n")
     
-    # Discover and run all tests
-    loader = unittest.TestLoader()
-    suite = loader.discover('tests', pattern='test_*.py')
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            shards = list(pool.map(_run_test_shard, range(jobs), [jobs] * jobs))
+        for *_, output in shards:
+            sys.stderr.write(output)
+        
+        tests_run = sum(shard[0] for shard in shards)
+        failures = sum(shard[1] for shard in shards)
+        errors = sum(shard[2] for shard in shards)
+        successful = all(shard[3] for shard in shards)
+    else:
+        import unittest
+        
+        # Discover and run all tests
+        loader = unittest.TestLoader()
+        suite = loader.discover('tests', pattern='test_*.py')
+        runner = unittest.TextTestRunner(verbosity=2)
+        result = runner.run(suite)
+        
+        tests_run = result.testsRun
+        failures = len(result.failures)
+        errors = len(result.errors)
+        successful = result.wasSuccessful()
     
     # Print summary
     print("\n" + "=" * 60)
     print("TEST SUMMARY")
     print("=" * 60)
-    print(f"Tests run: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
+    print(f"Tests run: {tests_run}")
+    print(f"Failures: {failures}")
+    print(f"Errors: {errors}")
     
-    if result.wasSuccessful():
+    if successful:
         success_rate = 100.0
         print(f"Success rate: {success_rate:.1f}%")
         print("\n🎉 ALL TESTS PASSED!")
     else:
-        failed = len(result.failures) + len(result.errors)
-        success_rate = ((result.testsRun - failed) / result.testsRun * 100) if result.testsRun > 0 else 0
+        failed = failures + errors
+        success_rate = ((tests_run - failed) / tests_run * 100) if tests_run > 0 else 0
         print(f"Success rate: {success_rate:.1f}%")
         print(f"\n❌ {failed} test(s) failed")
     
-    return result.wasSuccessful()
+    return successful
 
 
-def main():
-    """Main function - parse arguments and run tests."""
+# Flags the quick argument scan understands; anything else goes to argparse
+_BOOL_FLAGS = {
+    '-v': 'verbose', '--verbose': 'verbose',
+    '-s': 'summary', '--summary': 'summary',
+    '-f': 'failures_only', '--failures-only': 'failures_only',
+    '--run-all-tests': 'run_all_tests',
+}
+_VALUE_FLAGS = {
+    '-d': ('directory', str), '--directory': ('directory', str),
+    '-j': ('jobs', int), '--jobs': ('jobs', int),
+}
+
+
+def build_argument_parser():
+    """Build the full argparse parser (only needed for --help and usage errors)."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="HDL Parser and Chip Testing Framework",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -155,28 +242,82 @@ Examples:
         help='Show only summary output'
     )
     
+    parser.add_argument(
+        '-f', '--failures-only',
+        action='store_true',
+        help='List only the failing test cases in each chip report'
+    )
+    
     parser.add_argument(
         '-d', '--directory',
         default='.',
         help='Base directory for HDL files (default: current directory)'
     )
     
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of worker processes, 0 for one per spare CPU core (default: 1)'
+    )
+    
     parser.add_argument(
         '--run-all-tests',
         action='store_true',
         help='Run all unit and integration tests'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def parse_arguments(argv: List[str]) -> SimpleNamespace:
+    """
+    Scan the command line in one pass without loading argparse.
+    --help, unknown flags and malformed options are handed to argparse,
+    which prints the help text or the usage error.
+    """
+    args = SimpleNamespace(files=[], verbose=True, summary=False, failures_only=False,
+                           directory='.', jobs=1, run_all_tests=False)
+    
+    tokens = iter(argv)
+    for token in tokens:
+        if token == '--':
+            args.files.extend(tokens)
+            break
+        
+        if token == '-' or not token.startswith('-'):
+            args.files.append(token)
+        elif token in _BOOL_FLAGS:
+            setattr(args, _BOOL_FLAGS[token], True)
+        else:
+            flag, has_value, value = token.partition('=')
+            if not has_value:
+                value = next(tokens, None) if flag in _VALUE_FLAGS else None
+            if flag not in _VALUE_FLAGS or value is None or value.startswith('-'):
+                return build_argument_parser().parse_args(argv)
+            
+            name, convert = _VALUE_FLAGS[flag]
+            try:
+                setattr(args, name, convert(value))
+            except ValueError:
+                return build_argument_parser().parse_args(argv)
+    
+    return args
+
+
+def main():
+    """Main function - parse arguments and run tests."""
+    args = parse_arguments(sys.argv[1:])
+    jobs = args.jobs if args.jobs > 0 else max(1, (os.cpu_count() or 1) - 2)
     
     # Handle --run-all-tests option
     if args.run_all_tests:
-        success = run_all_tests()
+        success = run_all_tests(jobs)
         sys.exit(0 if success else 1)
     
     # Need file arguments if not running all tests
     if not args.files:
-        parser.error("Provide HDL and test file pairs, or use --run-all-tests")
+        build_argument_parser().error("Provide HDL and test file pairs, or use --run-all-tests")
     
     try:
         # Print header
@@ -188,7 +329,7 @@ Examples:
         
         # Run tests (verbose unless --summary specified)
         verbose = not args.summary
-        success = run_tests(file_pairs, verbose)
+        success = run_tests(file_pairs, verbose, jobs, trace=not args.failures_only)
         
         # Exit with appropriate code
         sys.exit(0 if success else 1)
@@ -0,0 +1,23 @@
+"""
+Bits - packs columns of 0/1 values into ints and back
+
+Shared by the simulator and the gates, so batch code on both sides can
+keep one bit per input vector in a single int.
+"""
+
+from typing import List, Sequence
+
+
+def pack_bits(values: Sequence[int]) -> int:
+    """Pack a column of 0/1 values into one int, value k going to bit k."""
+    if not values:
+        return 0
+    return int(''.join('1' if value else '0' for value in reversed(values)), 2)
+
+
+def unpack_bits(packed: int, width: int) -> List[int]:
+    """Unpack the low `width` bits of an int back into a column of 0/1 values."""
+    if width <= 0:
+        return []
+    bits = format(packed & ((1 << width) - 1), f'0{width}b')
+    return [1 if bit == '1' else 0 for bit in reversed(bits)]
@@ -4,201 +4,552 @@ Chip Simulator - actually runs the chips with given inputs
 Handles built-in gates and loads/simulates custom chips from HDL files.
 """
 
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Sequence, Tuple
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import fields
+import hashlib
 import os
+import pickle
+from .bits import pack_bits, unpack_bits
 from .hdl_parser import HDLParser, ChipDefinition, PartInstance
 
 
-@dataclass
-class Signal:
-    """Represents a signal wire with a value."""
-    name: str
-    value: Optional[int] = None
+# Parsed chip definitions shared by every simulator and chip instance in the
+# process, keyed by absolute HDL path, so each file is only parsed once (until
+# its mtime changes)
+_CHIP_DEF_CACHE: Dict[str, Tuple[Optional[int], ChipDefinition]] = {}
+_SHARED_PARSER = HDLParser()
+
+
+# (base directory, chip name) -> absolute HDL path, so each path is built once
+_HDL_PATH_CACHE: Dict[Tuple[str, str], str] = {}
+
+
+def chip_hdl_path(base_directory: str, chip_name: str) -> str:
+    """Get the absolute path of a chip's HDL file in a directory."""
+    key = (base_directory, chip_name)
+    hdl_path = _HDL_PATH_CACHE.get(key)
+    if hdl_path is None:
+        hdl_path = os.path.abspath(os.path.join(base_directory, f"{chip_name}.hdl"))
+        _HDL_PATH_CACHE[key] = hdl_path
+    return hdl_path
+
+
+# Set this to a directory (e.g. ~/.cache/nand2tetris) to keep parsed chips on
+# disk between runs; off when unset
+DISK_CACHE_ENV = 'NAND2TETRIS_HDL_CACHE'
+
+
+def _pickle_layout_version() -> str:
+    """
+    Fingerprint the fields (names and annotated types) of the pickled
+    parser classes. It's part of every entry's file name, so entries written
+    before a layout change miss instead of loading as garbage.
+    """
+    layout = [(cls.__qualname__, [(f.name, str(f.type)) for f in fields(cls)])
+              for cls in (ChipDefinition, PartInstance)]
+    return hashlib.sha1(repr(layout).encode('utf-8')).hexdigest()[:12]
+
+
+_DISK_CACHE_VERSION = _pickle_layout_version()
+
+
+def _parse_with_disk_cache(abs_path: str) -> ChipDefinition:
+    """
+    Parse an HDL file, reusing a pickled result from an earlier run if one
+    exists. Entries are keyed by path, mtime and size, so editing the file
+    makes the old entry miss instead of needing to be cleared.
+    """
+    cache_dir = os.environ.get(DISK_CACHE_ENV)
+    if not cache_dir:
+        return _SHARED_PARSER.parse_file(abs_path)
+    
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return _SHARED_PARSER.parse_file(abs_path)  # Let the parser report it
+    
+    digest = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()
+    cache_path = os.path.join(os.path.expanduser(cache_dir),
+                              f"{digest}-{stat.st_mtime_ns}-{stat.st_size}-v{_DISK_CACHE_VERSION}.pkl")
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cached = pickle.load(cache_file)
+    except Exception:
+        cached = None  # Missing, truncated, corrupt or stale entry
+    if isinstance(cached, ChipDefinition):
+        return cached
+    
+    chip_def = _SHARED_PARSER.parse_file(abs_path)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as cache_file:
+            pickle.dump(chip_def, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass  # The cache is only an optimisation
+    return chip_def
+
+
+def _file_mtime(path: str) -> Optional[int]:
+    """Get a file's modification time in nanoseconds, or None if it can't be read."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_chip_definition(hdl_path: str) -> ChipDefinition:
+    """
+    Load an HDL file through the process-wide definition cache.
+    A cached entry is only reused while the file's mtime is unchanged.
+    """
+    # Paths from chip_hdl_path are already absolute, so try them as-is first
+    abs_path = hdl_path if hdl_path in _CHIP_DEF_CACHE else os.path.abspath(hdl_path)
+    mtime = _file_mtime(abs_path)
+    
+    entry = _CHIP_DEF_CACHE.get(abs_path)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+    
+    chip_def = _parse_with_disk_cache(abs_path)
+    _CHIP_DEF_CACHE[abs_path] = (mtime, chip_def)
+    return chip_def
+
+
+# Truth tables of the built-in gates, indexed by (a << 1) | b
+NAND = (1, 1, 1, 0)
+AND = (0, 0, 0, 1)
+OR = (0, 1, 1, 1)
+NOT = (1, 0)
 
 
 class BuiltInGates:
-    """Logic for the 4 basic gates we need to support."""
+    """Logic for the 4 basic gates we need to support (inputs are 0 or 1)."""
     
     @staticmethod
     def nand(a: int, b: int) -> int:
         """NAND gate: output is 0 only when both inputs are 1."""
-        return 0 if (a == 1 and b == 1) else 1
+        return NAND[(a << 1) | b]
     
     @staticmethod
     def not_gate(input_val: int) -> int:
         """NOT gate: flip the input."""
-        return 1 if input_val == 0 else 0
+        return NOT[input_val]
     
     @staticmethod
     def and_gate(a: int, b: int) -> int:
         """AND gate: output is 1 only when both inputs are 1."""
-        return 1 if (a == 1 and b == 1) else 0
+        return AND[(a << 1) | b]
     
     @staticmethod
     def or_gate(a: int, b: int) -> int:
         """OR gate: output is 1 when at least one input is 1."""
-        return 1 if (a == 1 or b == 1) else 0
+        return OR[(a << 1) | b]
+
+
+# Opcodes used in the flattened gate netlist
+GATE_IDS = {'Nand': 0, 'Not': 1, 'And': 2, 'Or': 3}
+
+# Source templates for each gate, used to generate the netlist kernel. Values
+# are ints whose bit k is the signal in the k-th input vector (a single run is
+# just width 1); `mask` keeps the inverting gates to the batch width
+_GATE_EXPRS = (
+    '~({a} & {b}) & mask',
+    '~{a} & mask',
+    '{a} & {b}',
+    '{a} | {b}',
+)
 
 
 class ChipInstance:
-    """Represents a chip that we're simulating."""
+    """
+    Represents a chip that we're simulating.
+    
+    The chip is flattened into a netlist of built-in gates when the instance
+    is created: custom sub-chips are inlined recursively, and every signal
+    gets an integer slot in one flat byte array of values (unset signals read
+    as 0). The sorted (opcode, in_a, in_b, out) tuples are then turned into
+    one generated Python function, so simulating is a single call; only the
+    output slots are written back to the value array.
+    """
+    
+    __slots__ = ('definition', 'base_directory', 'signal_index', 'ops', '_slot_count',
+                 'values', '_driven_outputs', '_output_slots', '_state_slots', '_kernel',
+                 'sources')
     
     def __init__(self, definition: ChipDefinition, base_directory: str = "."):
         self.definition = definition
-        self.base_directory = base_directory
-        self.signals = {}  # All signals in this chip
-        self.sub_chips = []  # Child chips used by this one
+        self.base_directory = os.path.abspath(base_directory)
+        self.sources = {}  # HDL path -> definition, for every sub-chip inlined
+        self.signal_index = {}  # Signal name -> slot, for this chip's own signals
+        self.ops = []  # Flattened netlist of (opcode, in_a, in_b, out) tuples
+        self._slot_count = 0
         
         # Set up input/output signals
         for pin_name in definition.inputs:
-            self.signals[pin_name] = Signal(pin_name)
+            self._get_slot(self.signal_index, pin_name)
         for pin_name in definition.outputs:
-            self.signals[pin_name] = Signal(pin_name)
+            self._get_slot(self.signal_index, pin_name)
+        
+        # Inline every part down to built-in gates
+        self._flatten(definition, self.signal_index, (definition.name,))
+        self._sort_ops()
+        
+        self.values = bytearray(self._slot_count)
+        
+        # Outputs that some gate drives (undriven ones are never reported)
+        driven = {out for _, _, _, out in self.ops}
+        self._driven_outputs = [pin_name for pin_name in definition.outputs
+                                if self.signal_index[pin_name] in driven]
+        self._output_slots = [self.signal_index[pin_name] for pin_name in self._driven_outputs]
+        # Internal wires only live inside the kernel, so these are the only
+        # slots a run can leave behind
+        self._state_slots = sorted({self.signal_index[pin_name] for pin_name in definition.inputs}
+                                   | set(self._output_slots))
+        self._kernel = None  # Generated on first simulation
+    
+    def _sort_ops(self):
+        """
+        Order the netlist so each gate runs after the gates that feed it.
+        Parts can be written in any order in HDL; a feedback loop is an error.
+        """
+        writers = {}  # Slot -> indices of the ops that drive it
+        for index, (_, _, _, out) in enumerate(self.ops):
+            writers.setdefault(out, []).append(index)
         
-        # Create instances of all sub-chips
-        self._create_sub_chips()
+        readers = [[] for _ in self.ops]  # Op index -> ops reading its output
+        pending = [0] * len(self.ops)  # Op index -> feeding ops not yet placed
+        for index, (_, in_a, in_b, _) in enumerate(self.ops):
+            for slot in {in_a, in_b}:
+                for writer in writers.get(slot, ()):
+                    readers[writer].append(index)
+                    pending[index] += 1
+        
+        # Kahn's algorithm, keeping HDL order among gates that are ready
+        ready = deque(index for index, count in enumerate(pending) if count == 0)
+        ordered = []
+        while ready:
+            index = ready.popleft()
+            ordered.append(self.ops[index])
+            for reader in readers[index]:
+                pending[reader] -= 1
+                if pending[reader] == 0:
+                    ready.append(reader)
+        
+        if len(ordered) != len(self.ops):
+            raise ValueError(f"Chip {self.definition.name} has a combinational loop")
+        self.ops = ordered
+    
+    def _new_slot(self) -> int:
+        """Allocate a fresh signal slot."""
+        slot = self._slot_count
+        self._slot_count += 1
+        return slot
     
-    def _create_sub_chips(self):
-        """Create instances for all chips used in PARTS section."""
-        for part in self.definition.parts:
+    def _get_slot(self, slots: Dict[str, int], signal_name: str) -> int:
+        """Get the slot for a signal name, allocating one on first use."""
+        slot = slots.get(signal_name)
+        if slot is None:
+            slot = self._new_slot()
+            slots[signal_name] = slot
+        return slot
+    
+    def _flatten(self, definition: ChipDefinition, slots: Dict[str, int], active: tuple):
+        """Emit gate ops for all parts of a definition, inlining custom chips."""
+        for part in definition.parts:
             if self._is_builtin_gate(part.chip_type):
-                # Built-in gates don't need chip definitions
-                self.sub_chips.append({
-                    'type': part.chip_type,
-                    'connections': part.connections,
-                    'instance': None
-                })
+                self._emit_gate(part, slots)
+            else:
+                self._inline_chip(part, slots, active)
+    
+    def _emit_gate(self, part: PartInstance, slots: Dict[str, int]):
+        """Add one built-in gate to the netlist."""
+        connections = part.connections
+        pins = ('in', 'out') if part.chip_type == 'Not' else ('a', 'b', 'out')
+        for pin_name in pins:
+            if pin_name not in connections:
+                raise ValueError(f"{part.chip_type} part is missing pin '{pin_name}'")
+        
+        if part.chip_type == 'Not':
+            in_a = in_b = self._get_slot(slots, connections['in'])
+        else:
+            in_a = self._get_slot(slots, connections['a'])
+            in_b = self._get_slot(slots, connections['b'])
+        out = self._get_slot(slots, connections['out'])
+        
+        self.ops.append((GATE_IDS[part.chip_type], in_a, in_b, out))
+    
+    def _inline_chip(self, part: PartInstance, slots: Dict[str, int], active: tuple):
+        """Inline a custom chip, wiring its pins to the parent's signals."""
+        if part.chip_type in active:
+            raise ValueError(f"Chip {part.chip_type} instantiates itself")
+        
+        # Load the HDL file for this chip type
+        chip_def = self._load_chip_definition(part.chip_type)
+        
+        # Connected pins share the parent's slot, everything else is new
+        sub_slots = {}
+        for pin_name in list(chip_def.inputs) + list(chip_def.outputs):
+            signal_name = part.connections.get(pin_name)
+            if signal_name is None:
+                sub_slots[pin_name] = self._new_slot()
             else:
-                # Load the HDL file for this chip type
-                chip_def = self._load_chip_definition(part.chip_type)
-                sub_instance = ChipInstance(chip_def, self.base_directory)
-                self.sub_chips.append({
-                    'type': part.chip_type,
-                    'connections': part.connections,
-                    'instance': sub_instance
-                })
+                sub_slots[pin_name] = self._get_slot(slots, signal_name)
+        
+        self._flatten(chip_def, sub_slots, active + (part.chip_type,))
     
     def _is_builtin_gate(self, chip_type: str) -> bool:
         """Check if this is one of our 4 built-in gates."""
-        return chip_type in ['Nand', 'Not', 'And', 'Or']
+        return chip_type in GATE_IDS
     
     def _load_chip_definition(self, chip_type: str) -> ChipDefinition:
         """Load and parse the HDL file for a chip type."""
-        hdl_path = os.path.join(self.base_directory, f"{chip_type}.hdl")
-        parser = HDLParser()
-        return parser.parse_file(hdl_path)
+        hdl_path = chip_hdl_path(self.base_directory, chip_type)
+        chip_def = self.sources[hdl_path] = load_chip_definition(hdl_path)
+        return chip_def
+    
+    def reset(self):
+        """Clear the inputs and outputs so the next run doesn't see the previous one."""
+        values = self.values
+        for slot in self._state_slots:
+            values[slot] = 0
     
     def set_inputs(self, input_values: Dict[str, int]):
-        """Set the input pin values for this chip."""
+        """Set the input pin values for this chip (any non-zero value is 1)."""
+        values = self.values
+        find_slot = self.signal_index.get
         for pin_name, value in input_values.items():
-            if pin_name in self.signals:
-                self.signals[pin_name].value = value
+            slot = find_slot(pin_name)
+            if slot is not None:
+                values[slot] = 1 if value else 0
     
     def get_outputs(self) -> Dict[str, int]:
         """Get the current output pin values."""
-        outputs = {}
-        for pin_name in self.definition.outputs:
-            if pin_name in self.signals and self.signals[pin_name].value is not None:
-                outputs[pin_name] = self.signals[pin_name].value
-        return outputs
+        values = self.values
+        signal_index = self.signal_index
+        return {pin_name: values[signal_index[pin_name]]
+                for pin_name in self._driven_outputs}
     
     def simulate(self):
-        """Run the simulation - propagate signals through all sub-chips."""
-        # Process each sub-chip
-        for sub_chip_info in self.sub_chips:
-            chip_type = sub_chip_info['type']
-            connections = sub_chip_info['connections']
-            instance = sub_chip_info['instance']
-            
-            if self._is_builtin_gate(chip_type):
-                # Handle built-in gates directly
-                self._simulate_builtin_gate(chip_type, connections)
-            else:
-                # Handle custom chips recursively
-                self._simulate_custom_chip(instance, connections)
-    
-    def _simulate_builtin_gate(self, gate_type: str, connections: Dict[str, str]):
-        """Simulate one of the built-in gates."""
-        # Get input values from our signals
-        if gate_type == 'Nand':
-            a = self.signals[connections['a']].value
-            b = self.signals[connections['b']].value
-            result = BuiltInGates.nand(a, b)
-            self._set_signal(connections['out'], result)
-            
-        elif gate_type == 'Not':
-            input_val = self.signals[connections['in']].value
-            result = BuiltInGates.not_gate(input_val)
-            self._set_signal(connections['out'], result)
-            
-        elif gate_type == 'And':
-            a = self.signals[connections['a']].value
-            b = self.signals[connections['b']].value
-            result = BuiltInGates.and_gate(a, b)
-            self._set_signal(connections['out'], result)
-            
-        elif gate_type == 'Or':
-            a = self.signals[connections['a']].value
-            b = self.signals[connections['b']].value
-            result = BuiltInGates.or_gate(a, b)
-            self._set_signal(connections['out'], result)
-    
-    def _simulate_custom_chip(self, instance: 'ChipInstance', connections: Dict[str, str]):
-        """Simulate a custom chip (loaded from HDL file)."""
-        # Prepare input values for the sub-chip
-        sub_inputs = {}
-        for pin_name in instance.definition.inputs:
-            if pin_name in connections:
-                signal_name = connections[pin_name]
-                sub_inputs[pin_name] = self.signals[signal_name].value
-        
-        # Set inputs and run simulation
-        instance.set_inputs(sub_inputs)
-        instance.simulate()
+        """Run the simulation - evaluate the whole netlist for the current inputs."""
+        values = self.values
+        kernel = self._kernel or self._compile_kernel()
+        for slot, value in zip(self._output_slots, kernel(values, 1)):
+            values[slot] = value
+    
+    def simulate_packed(self, input_planes: Dict[str, int], width: int) -> Dict[str, int]:
+        """
+        Simulate `width` input vectors in one pass over the netlist.
+        Each input pin maps to an int whose bit k is the pin's value in
+        vector k; outputs are returned packed the same way.
+        """
+        kernel = self._kernel or self._compile_kernel()
         
-        # Get outputs and update our signals
-        sub_outputs = instance.get_outputs()
-        for pin_name in instance.definition.outputs:
-            if pin_name in connections:
-                signal_name = connections[pin_name]
-                if pin_name in sub_outputs:
-                    self._set_signal(signal_name, sub_outputs[pin_name])
+        mask = (1 << width) - 1
+        planes = [0] * self._slot_count
+        find_slot = self.signal_index.get
+        for pin_name, plane in input_planes.items():
+            slot = find_slot(pin_name)
+            if slot is not None:
+                planes[slot] = plane & mask
+        
+        return dict(zip(self._driven_outputs, kernel(planes, mask)))
+    
+    def simulate_exhaustive(self) -> Dict[str, int]:
+        """
+        Simulate every combination of the chip's inputs in one packed pass.
+        Input i is bit i of the combination number k, so bit k of each
+        returned output is its value for combination k (the whole truth table).
+        """
+        input_pins = self.definition.inputs
+        width = 1 << len(input_pins)
+        
+        # Input i is 0 for 2^i combinations, then 1 for 2^i, and so on
+        planes = {}
+        for bit, pin_name in enumerate(input_pins):
+            span = 1 << bit
+            plane = ((1 << span) - 1) << span
+            length = span * 2
+            while length < width:
+                plane |= plane << length
+                length *= 2
+            planes[pin_name] = plane
+        
+        return self.simulate_packed(planes, width)
     
-    def _set_signal(self, signal_name: str, value: int):
-        """Set the value of a signal, creating it if needed."""
-        if signal_name not in self.signals:
-            self.signals[signal_name] = Signal(signal_name)
-        self.signals[signal_name].value = value
+    def _compile_kernel(self):
+        """
+        Generate one straight-line function that evaluates the whole netlist
+        and returns the driven outputs. Signals live in local variables, so
+        there is no loop, dispatch or list indexing per gate. The same code
+        runs single bits (mask 1) and packed batches.
+        """
+        written = set()
+        sources = set()  # Slots read before any gate writes them
+        for _, in_a, in_b, out in self.ops:
+            sources.update(slot for slot in (in_a, in_b) if slot not in written)
+            written.add(out)
+        
+        lines = ["def kernel(planes, mask):"]
+        lines.extend(f"    s{slot} = planes[{slot}]" for slot in sorted(sources))
+        for op, in_a, in_b, out in self.ops:
+            expr = _GATE_EXPRS[op].format(a=f"s{in_a}", b=f"s{in_b}")
+            lines.append(f"    s{out} = {expr}")
+        outputs = "".join(f"s{slot}, " for slot in self._output_slots)
+        lines.append(f"    return ({outputs})")
+        
+        namespace = {}
+        code = compile("\n".join(lines), f"<netlist {self.definition.name}>", "exec")
+        exec(code, namespace)
+        self._kernel = namespace["kernel"]
+        return self._kernel
+
+
+# Chips with at most this many inputs get a lookup table of all 2^n results
+LUT_MAX_INPUTS = 12
+
+# Wider chips remember the outputs of this many recent input vectors each
+RESULT_CACHE_SIZE = 4096
 
 
 class ChipSimulator:
     """Main simulator that loads chips and runs tests."""
     
     def __init__(self, base_directory: str = "."):
-        self.base_directory = base_directory
-        self.parser = HDLParser()
+        # Resolved once, so chip paths under it can be cached as absolute paths
+        self.base_directory = os.path.abspath(base_directory)
+        self.parser = _SHARED_PARSER
         self.loaded_chips = {}  # Cache for loaded chip definitions
+        self._instances = {}  # Cache for flattened chip instances
+        self._lut_cache = {}  # Chip name -> lookup table, or None if too wide
+        self._result_cache = {}  # Chip name -> LRU of input items -> outputs
+        # Chip name -> (HDL path, mtime) of every file its netlist was built from
+        self._sources = {}
     
     def simulate_chip(self, chip_name: str, inputs: Dict[str, int]) -> Dict[str, int]:
         """
         Load a chip, set its inputs, run simulation, return outputs.
         This is the main function called by the tester.
+        Chips with few inputs are answered from a lookup table built on
+        first use; wider chips run the gate netlist, remembering the outputs
+        of recently seen inputs (chips are combinational, so they're pure).
+        Everything cached for a chip is dropped once one of its HDL files changes.
         """
-        # Load chip definition if not cached
-        if chip_name not in self.loaded_chips:
-            self.loaded_chips[chip_name] = self.load_chip_definition(chip_name)
+        self._check_current(chip_name)
+        if chip_name not in self._lut_cache:
+            self._lut_cache[chip_name] = self._build_lut(chip_name)
+        
+        lut = self._lut_cache[chip_name]
+        if lut is not None:
+            input_pins, output_pins, table = lut
+            index = 0
+            for bit, pin_name in enumerate(input_pins):
+                if inputs.get(pin_name):
+                    index |= 1 << bit
+            packed_outputs = table[index]
+            return {pin_name: (packed_outputs >> bit) & 1
+                    for bit, pin_name in enumerate(output_pins)}
         
-        chip_def = self.loaded_chips[chip_name]
+        results = self._result_cache.get(chip_name)
+        if results is None:
+            results = self._result_cache[chip_name] = OrderedDict()
+        key = tuple(inputs.items())
+        outputs = results.get(key)
+        if outputs is not None:
+            results.move_to_end(key)
+            return dict(outputs)
         
-        # Create chip instance and simulate
-        instance = ChipInstance(chip_def, self.base_directory)
+        instance = self.compile(chip_name)
+        instance.reset()
         instance.set_inputs(inputs)
         instance.simulate()
         
-        return instance.get_outputs()
+        outputs = instance.get_outputs()
+        results[key] = dict(outputs)
+        if len(results) > RESULT_CACHE_SIZE:
+            results.popitem(last=False)
+        return outputs
+    
+    def simulate_batch(self, chip_name: str,
+                       inputs: Dict[str, Sequence[int]]) -> Dict[str, List[int]]:
+        """
+        Simulate many input vectors at once.
+        inputs maps each input pin to a column of values (one per vector);
+        returns each output pin mapped to its column of results.
+        """
+        instance = self.compile(chip_name)
+        width = max((len(column) for column in inputs.values()), default=0)
+        
+        planes = {pin_name: pack_bits(column) for pin_name, column in inputs.items()}
+        packed_outputs = instance.simulate_packed(planes, width)
+        
+        return {pin_name: unpack_bits(plane, width)
+                for pin_name, plane in packed_outputs.items()}
+    
+    def _build_lut(self, chip_name: str) -> Optional[Tuple[List[str], List[str], array]]:
+        """
+        Simulate every input combination of a chip in one packed pass.
+        Returns (input pins, output pins, table) where entry k holds the
+        output bits for the inputs packed into k (input i is bit i), or None
+        if the chip is too wide for a table.
+        """
+        instance = self.compile(chip_name)
+        input_pins = list(instance.definition.inputs)
+        if len(input_pins) > LUT_MAX_INPUTS or len(instance.definition.outputs) > 32:
+            return None
+        
+        width = 1 << len(input_pins)
+        packed_outputs = instance.simulate_exhaustive()
+        
+        table = array('I', [0]) * width
+        for bit, plane in enumerate(packed_outputs.values()):
+            for k, value in enumerate(unpack_bits(plane, width)):
+                if value:
+                    table[k] |= 1 << bit
+        return input_pins, list(packed_outputs), table
+    
+    def compile(self, chip_name: str) -> ChipInstance:
+        """
+        Flatten a chip into a gate netlist once and reuse it afterwards,
+        until the chip's HDL file or one of its sub-chips' files changes.
+        """
+        self._check_current(chip_name)
+        instance = self._instances.get(chip_name)
+        if instance is None:
+            # Load chip definition if not cached
+            if chip_name not in self.loaded_chips:
+                self.loaded_chips[chip_name] = self.load_chip_definition(chip_name)
+            
+            instance = ChipInstance(self.loaded_chips[chip_name], self.base_directory)
+            self._instances[chip_name] = instance
+            # The mtimes the definitions were loaded at, so an edit made while
+            # flattening is noticed on the next call
+            hdl_paths = [chip_hdl_path(self.base_directory, chip_name), *instance.sources]
+            self._sources[chip_name] = tuple((hdl_path, _CHIP_DEF_CACHE[hdl_path][0])
+                                             for hdl_path in hdl_paths if hdl_path in _CHIP_DEF_CACHE)
+        return instance
+    
+    def _check_current(self, chip_name: str):
+        """
+        Forget a chip's definition, netlist, lookup table and remembered
+        results if any HDL file its netlist was built from has changed.
+        """
+        sources = self._sources.get(chip_name)
+        if sources is None:
+            return
+        for hdl_path, mtime in sources:
+            if _file_mtime(hdl_path) != mtime:
+                break
+        else:
+            return
+        
+        for cache in (self.loaded_chips, self._instances, self._lut_cache,
+                      self._result_cache, self._sources):
+            cache.pop(chip_name, None)
     
     def load_chip_definition(self, chip_name: str) -> ChipDefinition:
         """Load and parse HDL file for a chip."""
-        hdl_path = os.path.join(self.base_directory, f"{chip_name}.hdl")
-        return self.parser.parse_file(hdl_path) 
\ No newline at end of file
+        return load_chip_definition(chip_hdl_path(self.base_directory, chip_name))
@@ -4,100 +4,177 @@ Built-in Gates - implements the 4 basic gates using strategy pattern
 Better organized gate implementations that I can extend easily.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Mapping, Optional, Any, Sequence
 from abc import ABC, abstractmethod
+from types import MappingProxyType
+from ..bits import pack_bits, unpack_bits
 from ..models.chip_models import BuiltinChipEvaluator, ChipDefinition, ChipType
 
 
 class GateLogic(ABC):
     """Base class for different gate logic implementations."""
     
+    # Whole truth table packed into an int for single-output gates: bit i is
+    # the output for the row whose input bits (first pin highest) spell i.
+    # None for logic that isn't described this way.
+    _tt_word: Optional[int] = None
+    
     @abstractmethod
-    def compute(self, inputs: Dict[str, int]) -> Dict[str, int]:
+    def compute(self, inputs: Dict[str, int]) -> Mapping[str, int]:
         """Figure out outputs given inputs."""
         pass
     
     @abstractmethod
-    def get_truth_table(self) -> List[Dict[str, Any]]:
+    def get_truth_table(self) -> Sequence[Mapping[str, Any]]:
         """Return the full truth table for this gate."""
         pass
 
 
+# Shared read-only outputs that the lookup tables below point at, so
+# compute() never has to build a new mapping and callers can't change them
+_OUT_0 = MappingProxyType({'out': 0})
+_OUT_1 = MappingProxyType({'out': 1})
+
+
+def _outputs_from_word(word: int, input_count: int) -> Dict[tuple, Mapping[str, int]]:
+    """
+    Expand a truth table word into a lookup of input bits (first pin first)
+    to output mapping. Anything that isn't a row of 0/1 bits has no entry.
+    """
+    table = {}
+    for row in range(1 << input_count):
+        bits = tuple((row >> shift) & 1 for shift in reversed(range(input_count)))
+        table[bits] = _OUT_1 if (word >> row) & 1 else _OUT_0
+    return table
+
+
+def _read_only_rows(*rows: Dict[str, int]) -> tuple:
+    """Freeze truth table rows, since the tables are shared by every caller."""
+    return tuple(MappingProxyType(row) for row in rows)
+
+
+def _invalid_inputs(gate_name: str, inputs: Mapping[str, Any]) -> ValueError:
+    """Build the error for gate inputs that aren't all 0 or 1."""
+    return ValueError(f"{gate_name} inputs must be 0 or 1, got {dict(inputs)}")
+
+
 class NandGateLogic(GateLogic):
     """NAND gate - output is 0 only when both inputs are 1."""
     
-    def compute(self, inputs: Dict[str, int]) -> Dict[str, int]:
+    _tt_word = 0b0111
+    
+    # Outputs keyed by (a, b)
+    _table = _outputs_from_word(_tt_word, 2)
+    
+    def compute(self, inputs: Dict[str, int]) -> Mapping[str, int]:
         """Compute NAND: out = NOT (a AND b)"""
-        a = inputs.get('a', 0)
-        b = inputs.get('b', 0)
-        result = 0 if (a == 1 and b == 1) else 1
-        return {'out': result}
+        try:
+            return self._table[inputs.get('a', 0), inputs.get('b', 0)]
+        except (KeyError, TypeError):
+            raise _invalid_inputs('NAND', inputs) from None
     
-    def get_truth_table(self) -> List[Dict[str, Any]]:
+    # Built once and shared by every caller, so read-only like the outputs above
+    _TRUTH_TABLE = _read_only_rows(
+        {'a': 0, 'b': 0, 'out': 1},
+        {'a': 0, 'b': 1, 'out': 1},
+        {'a': 1, 'b': 0, 'out': 1},
+        {'a': 1, 'b': 1, 'out': 0}
+    )
+    
+    def get_truth_table(self) -> Sequence[Mapping[str, Any]]:
         """NAND truth table."""
-        return [
-            {'a': 0, 'b': 0, 'out': 1},
-            {'a': 0, 'b': 1, 'out': 1},
-            {'a': 1, 'b': 0, 'out': 1},
-            {'a': 1, 'b': 1, 'out': 0}
-        ]
+        return self._TRUTH_TABLE
 
 
 class NotGateLogic(GateLogic):
     """NOT gate - just flip the input."""
     
-    def compute(self, inputs: Dict[str, int]) -> Dict[str, int]:
+    _tt_word = 0b01
+    
+    # Outputs keyed by (in,)
+    _table = _outputs_from_word(_tt_word, 1)
+    
+    def compute(self, inputs: Dict[str, int]) -> Mapping[str, int]:
         """Compute NOT: out = NOT in"""
-        input_val = inputs.get('in', 0)
-        result = 1 if input_val == 0 else 0
-        return {'out': result}
+        try:
+            return self._table[(inputs.get('in', 0),)]
+        except (KeyError, TypeError):
+            raise _invalid_inputs('NOT', inputs) from None
     
-    def get_truth_table(self) -> List[Dict[str, Any]]:
+    _TRUTH_TABLE = _read_only_rows(
+        {'in': 0, 'out': 1},
+        {'in': 1, 'out': 0}
+    )
+    
+    def get_truth_table(self) -> Sequence[Mapping[str, Any]]:
         """NOT truth table."""
-        return [
-            {'in': 0, 'out': 1},
-            {'in': 1, 'out': 0}
-        ]
+        return self._TRUTH_TABLE
 
 
 class AndGateLogic(GateLogic):
     """AND gate - output is 1 only when both inputs are 1."""
     
-    def compute(self, inputs: Dict[str, int]) -> Dict[str, int]:
+    _tt_word = 0b1000
+    
+    # Outputs keyed by (a, b)
+    _table = _outputs_from_word(_tt_word, 2)
+    
+    def compute(self, inputs: Dict[str, int]) -> Mapping[str, int]:
         """Compute AND: out = a AND b"""
-        a = inputs.get('a', 0)
-        b = inputs.get('b', 0)
-        result = 1 if (a == 1 and b == 1) else 0
-        return {'out': result}
+        try:
+            return self._table[inputs.get('a', 0), inputs.get('b', 0)]
+        except (KeyError, TypeError):
+            raise _invalid_inputs('AND', inputs) from None
     
-    def get_truth_table(self) -> List[Dict[str, Any]]:
+    _TRUTH_TABLE = _read_only_rows(
+        {'a': 0, 'b': 0, 'out': 0},
+        {'a': 0, 'b': 1, 'out': 0},
+        {'a': 1, 'b': 0, 'out': 0},
+        {'a': 1, 'b': 1, 'out': 1}
+    )
+    
+    def get_truth_table(self) -> Sequence[Mapping[str, Any]]:
         """AND truth table."""
-        return [
-            {'a': 0, 'b': 0, 'out': 0},
-            {'a': 0, 'b': 1, 'out': 0},
-            {'a': 1, 'b': 0, 'out': 0},
-            {'a': 1, 'b': 1, 'out': 1}
-        ]
+        return self._TRUTH_TABLE
 
 
 class OrGateLogic(GateLogic):
     """OR gate - output is 1 when at least one input is 1."""
     
-    def compute(self, inputs: Dict[str, int]) -> Dict[str, int]:
+    _tt_word = 0b1110
+    
+    # Outputs keyed by (a, b)
+    _table = _outputs_from_word(_tt_word, 2)
+    
+    def compute(self, inputs: Dict[str, int]) -> Mapping[str, int]:
         """Compute OR: out = a OR b"""
-        a = inputs.get('a', 0)
-        b = inputs.get('b', 0)
-        result = 1 if (a == 1 or b == 1) else 0
-        return {'out': result}
+        try:
+            return self._table[inputs.get('a', 0), inputs.get('b', 0)]
+        except (KeyError, TypeError):
+            raise _invalid_inputs('OR', inputs) from None
     
-    def get_truth_table(self) -> List[Dict[str, Any]]:
+    _TRUTH_TABLE = _read_only_rows(
+        {'a': 0, 'b': 0, 'out': 0},
+        {'a': 0, 'b': 1, 'out': 1},
+        {'a': 1, 'b': 0, 'out': 1},
+        {'a': 1, 'b': 1, 'out': 1}
+    )
+    
+    def get_truth_table(self) -> Sequence[Mapping[str, Any]]:
         """OR truth table."""
-        return [
-            {'a': 0, 'b': 0, 'out': 0},
-            {'a': 0, 'b': 1, 'out': 1},
-            {'a': 1, 'b': 0, 'out': 1},
-            {'a': 1, 'b': 1, 'out': 1}
-        ]
+        return self._TRUTH_TABLE
+
+
+# Packed versions of the standard gate logic, with the pins they read, so
+# gates built from these classes can skip the dict-based compute(). They work
+# on packed ints (one bit per input vector) and take a mask of the bits in
+# use, so inverting gates don't set bits above it.
+_FAST_GATE_FUNCS = {
+    NandGateLogic: (('a', 'b'), lambda a, b, mask: ~(a & b) & mask),
+    NotGateLogic: (('in',), lambda in_val, mask: ~in_val & mask),
+    AndGateLogic: (('a', 'b'), lambda a, b, mask: a & b),
+    OrGateLogic: (('a', 'b'), lambda a, b, mask: a | b),
+}
 
 
 class BuiltinGate(BuiltinChipEvaluator):
@@ -108,34 +185,78 @@ class BuiltinGate(BuiltinChipEvaluator):
     
     def __init__(self, name: str, inputs: List[str], outputs: List[str], 
                  logic: GateLogic, description: str = ""):
-        self.name = name
-        self.inputs = inputs
-        self.outputs = outputs
-        self.logic = logic
+        super().__init__(name, inputs, outputs)
         self.description = description
+        self.logic = logic
+    
+    @property
+    def logic(self) -> GateLogic:
+        """The logic strategy this gate runs."""
+        return self._logic
+    
+    @logic.setter
+    def logic(self, logic: GateLogic):
+        # Swapping the strategy rebinds everything derived from it
+        self._logic = logic
+        self._compute = logic.compute  # Bound once, not looked up per call
+        
+        # Truth table word and packed function when the logic is one of the
+        # standard gates wired to its usual pins, otherwise None
+        fast = _FAST_GATE_FUNCS.get(type(logic))
+        if fast is not None and tuple(self.inputs) == fast[0] and list(self.outputs) == ['out']:
+            self._compute_packed = fast[1]
+            self._tt_word = logic._tt_word
+        else:
+            self._compute_packed = None
+            self._tt_word = None
+        
+        self._truth_table_ok = None  # Cached test_all_combinations() result
     
     def evaluate(self, input_values: Dict[str, int]) -> Dict[str, int]:
         """Run the gate with given inputs and return outputs."""
-        # Check that we have all required inputs
-        for pin in self.inputs:
-            if pin not in input_values:
-                raise ValueError(f"Missing input pin '{pin}' for gate {self.name}")
-        
-        # Check input values are valid (0 or 1)
-        for pin, value in input_values.items():
-            if pin in self.inputs and value not in (0, 1):
-                raise ValueError(f"Invalid value {value} for pin '{pin}' (must be 0 or 1)")
+        # Input checks only run in debug mode (i.e. not under python -O)
+        if __debug__:
+            # Check that we have all required inputs
+            for pin in self.inputs:
+                if pin not in input_values:
+                    raise ValueError(f"Missing input pin '{pin}' for gate {self.name}")
+            
+            # Check input values are valid (0 or 1)
+            for pin, value in input_values.items():
+                if pin in self.inputs and value not in (0, 1):
+                    raise ValueError(f"Invalid value {value} for pin '{pin}' (must be 0 or 1)")
         
-        # Run the logic
-        result = self.logic.compute(input_values)
+        # Standard gates: read the output bit straight out of the truth table word
+        word = self._tt_word
+        if word is not None:
+            row = 0
+            for pin in self.inputs:
+                row = (row << 1) | input_values[pin]
+            return {'out': (word >> row) & 1}
         
-        # Make sure we got all expected outputs
+        # Run the logic and make sure we got all expected outputs
+        result = self._compute(input_values)
         for pin in self.outputs:
             if pin not in result:
                 raise ValueError(f"Gate {self.name} didn't produce output pin '{pin}'")
         
         return result
     
+    def evaluate_packed(self, packed_inputs: Dict[str, int], width: int) -> Dict[str, int]:
+        """
+        Run the gate on `width` input vectors at once, packed into one int per
+        pin (vector k in bit k), and return the outputs packed the same way.
+        Use pack_bits/unpack_bits from src.bits to convert bit columns.
+        """
+        mask = (1 << width) - 1
+        if self._compute_packed is not None:
+            return {'out': self._compute_packed(*[packed_inputs[pin] for pin in self.inputs], mask)}
+        
+        # Custom logic: one evaluate() per vector, repacked afterwards
+        columns = [unpack_bits(packed_inputs[pin], width) for pin in self.inputs]
+        rows = [self.evaluate(dict(zip(self.inputs, bits))) for bits in zip(*columns)]
+        return {pin: pack_bits([row[pin] for row in rows]) & mask for pin in self.outputs}
+    
     def get_chip_definition(self) -> ChipDefinition:
         """Return a chip definition for this gate."""
         from ..models.chip_models import Pin, PinType, create_chip_definition
@@ -152,23 +273,27 @@ class BuiltinGate(BuiltinChipEvaluator):
         )
     
     def test_all_combinations(self) -> bool:
-        """Test this gate against its truth table to make sure it works."""
+        """
+        Test this gate against its truth table to make sure it works.
+        The answer is worked out once and cached until the logic is swapped.
+        """
+        if self._truth_table_ok is None:
+            self._truth_table_ok = self._check_truth_table()
+        return self._truth_table_ok
+    
+    def _check_truth_table(self) -> bool:
+        """Run every truth table row through the gate and compare outputs."""
         truth_table = self.logic.get_truth_table()
         
-        for row in truth_table:
-            # Separate inputs from expected outputs
-            inputs = {k: v for k, v in row.items() if k in self.inputs}
-            expected_outputs = {k: v for k, v in row.items() if k in self.outputs}
-            
-            # Run the gate
-            actual_outputs = self.evaluate(inputs)
-            
-            # Check if outputs match
-            for pin, expected in expected_outputs.items():
-                if actual_outputs.get(pin) != expected:
-                    return False
+        # Evaluate every row in one packed call and compare the output columns
+        packed_inputs = {pin: pack_bits([row[pin] for row in truth_table]) for pin in self.inputs}
+        try:
+            actual_outputs = self.evaluate_packed(packed_inputs, len(truth_table))
+        except ValueError:
+            return False
         
-        return True
+        return all(actual_outputs[pin] == pack_bits([row[pin] for row in truth_table])
+                   for pin in self.outputs if all(pin in row for row in truth_table))
 
 
 class GateFactory:
@@ -179,43 +304,46 @@ class GateFactory:
         'Nand': {
             'inputs': ['a', 'b'],
             'outputs': ['out'],
-            'logic_class': NandGateLogic,
+            'logic': NandGateLogic(),  # Stateless, so shared by every Nand gate
             'description': 'NAND gate: out = NOT (a AND b)'
         },
         'Not': {
             'inputs': ['in'],
             'outputs': ['out'],
-            'logic_class': NotGateLogic,
+            'logic': NotGateLogic(),  # Stateless, so shared by every Not gate
             'description': 'NOT gate: out = NOT in'
         },
         'And': {
             'inputs': ['a', 'b'],
             'outputs': ['out'],
-            'logic_class': AndGateLogic,
+            'logic': AndGateLogic(),  # Stateless, so shared by every And gate
             'description': 'AND gate: out = a AND b'
         },
         'Or': {
             'inputs': ['a', 'b'],
             'outputs': ['out'],
-            'logic_class': OrGateLogic,
+            'logic': OrGateLogic(),  # Stateless, so shared by every Or gate
             'description': 'OR gate: out = a OR b'
         }
     }
     
     @classmethod
     def create_gate(cls, gate_name: str) -> BuiltinGate:
-        """Create a gate by name."""
+        """
+        Create a new gate by name. Every call builds a fresh gate the caller
+        owns and may change (e.g. swap its logic); only the stateless logic
+        objects are shared. Use get_builtin_gate() for the shared instances.
+        """
         if gate_name not in cls._gate_definitions:
             raise ValueError(f"Don't know how to make gate: {gate_name}")
         
         definition = cls._gate_definitions[gate_name]
-        logic = definition['logic_class']()
         
         return BuiltinGate(
             name=gate_name,
             inputs=definition['inputs'],
             outputs=definition['outputs'],
-            logic=logic,
+            logic=definition['logic'],
             description=definition['description']
         )
     
@@ -238,11 +366,27 @@ class GateFactory:
         return gate_name in cls._gate_definitions
 
 
+# The four shared built-in gates, created once at import
+NAND_GATE = GateFactory.create_gate('Nand')
+NOT_GATE = GateFactory.create_gate('Not')
+AND_GATE = GateFactory.create_gate('And')
+OR_GATE = GateFactory.create_gate('Or')
+
+# Read-only name -> gate lookup behind the helper functions below
+_GATES = MappingProxyType({
+    'Nand': NAND_GATE,
+    'Not': NOT_GATE,
+    'And': AND_GATE,
+    'Or': OR_GATE,
+})
+
+
 class GateRegistry:
     """Keeps track of all our built-in gates."""
     
     def __init__(self):
-        self._gates = GateFactory.create_all_gates()
+        self._gates = dict(_GATES)
+        self._gates_view = MappingProxyType(self._gates)
     
     def get_gate(self, gate_name: str) -> BuiltinGate:
         """Get a gate by name."""
@@ -250,9 +394,12 @@ class GateRegistry:
             raise ValueError(f"Unknown gate: {gate_name}")
         return self._gates[gate_name]
     
-    def get_all_gates(self) -> Dict[str, BuiltinGate]:
-        """Get all gates."""
-        return self._gates.copy()
+    def get_all_gates(self) -> Mapping[str, BuiltinGate]:
+        """
+        Get all gates, as a read-only view of the registry (no copy is made).
+        Use dict(registry.get_all_gates()) if you need one you can change.
+        """
+        return self._gates_view
     
     def is_builtin(self, gate_name: str) -> bool:
         """Check if this is a built-in gate."""
@@ -267,55 +414,71 @@ class GateRegistry:
         return True
 
 
-# Global registry that everyone can use
-gate_registry = GateRegistry()
+# Global registry that everyone can use, built the first time it's needed
+_gate_registry: Optional[GateRegistry] = None
+
+
+def _get_gate_registry() -> GateRegistry:
+    """Get the global registry, creating it on first use."""
+    global _gate_registry
+    if _gate_registry is None:
+        _gate_registry = GateRegistry()
+    return _gate_registry
+
+
+def __getattr__(name: str):
+    """Create `gate_registry` lazily when it's first accessed (PEP 562)."""
+    if name == 'gate_registry':
+        return _get_gate_registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Helper functions for easy access
 def get_builtin_gate(gate_name: str) -> BuiltinGate:
-    """Get a built-in gate by name."""
-    return gate_registry.get_gate(gate_name)
+    """
+    Get the shared built-in gate by name. Don't change it; use
+    GateFactory.create_gate() for a gate of your own.
+    """
+    gate = _GATES.get(gate_name)
+    if gate is None:
+        raise ValueError(f"Unknown gate: {gate_name}")
+    return gate
 
 
 def is_builtin_gate(gate_name: str) -> bool:
     """Check if this is a built-in gate."""
-    return gate_registry.is_builtin(gate_name)
+    return gate_name in _GATES
 
 
 def validate_all_builtin_gates() -> bool:
     """Test all built-in gates."""
-    return gate_registry.validate_all_gates()
+    return _get_gate_registry().validate_all_gates()
 
 
 def get_all_builtin_gates() -> Dict[str, BuiltinGate]:
     """Get all built-in gates."""
-    return gate_registry.get_all_gates()
+    return dict(_GATES)
 
 
 # Legacy compatibility for old code
 class BuiltInGates:
-    """Old-style interface for backwards compatibility."""
+    """
+    Old-style interface for backwards compatibility (inputs are 0 or 1).
+    Plain bit expressions, so these never go through the gate objects.
+    """
     
     @staticmethod
     def nand(a: int, b: int) -> int:
-        gate = get_builtin_gate('Nand')
-        result = gate.evaluate({'a': a, 'b': b})
-        return result['out']
+        return 1 ^ (a & b)
     
     @staticmethod
     def not_gate(input_val: int) -> int:
-        gate = get_builtin_gate('Not')
-        result = gate.evaluate({'in': input_val})
-        return result['out']
+        return 1 ^ input_val
     
     @staticmethod
     def and_gate(a: int, b: int) -> int:
-        gate = get_builtin_gate('And')
-        result = gate.evaluate({'a': a, 'b': b})
-        return result['out']
+        return a & b
     
     @staticmethod
     def or_gate(a: int, b: int) -> int:
-        gate = get_builtin_gate('Or')
-        result = gate.evaluate({'a': a, 'b': b})
-        return result['out'] 
\ No newline at end of file
+        return a | b
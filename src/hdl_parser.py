@@ -5,70 +5,141 @@ My implementation for parsing HDL syntax and building chip definitions.
 """
 
 import re
-from typing import Dict, List, Optional, Tuple, Any
+import sys
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Any
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChipDefinition:
-    """Basic chip definition with inputs, outputs, and parts."""
+    """
+    Basic chip definition with inputs, outputs, and parts.
+    Parsed definitions are shared between callers, so pins and parts are
+    stored as tuples and a definition can't be rewired after parsing.
+    """
     name: str
-    inputs: List[str]
-    outputs: List[str]
-    parts: List['PartInstance']
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    parts: Tuple['PartInstance', ...]
+    
+    def __post_init__(self):
+        # Accept any sequence from callers, but store it read-only
+        for field_name in ('inputs', 'outputs', 'parts'):
+            value = getattr(self, field_name)
+            if type(value) is not tuple:
+                object.__setattr__(self, field_name, tuple(value))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PartInstance:
-    """A single chip instance used inside another chip."""
+    """
+    A single chip instance used inside another chip.
+    Parsed parts wired the same way share one read-only connections mapping.
+    """
     chip_type: str
-    connections: Dict[str, str]
+    connections: Mapping[str, str]
+    
+    def __post_init__(self):
+        # Parsed parts already carry a shared proxy; wrap a copy of anything else
+        if type(self.connections) is not MappingProxyType:
+            object.__setattr__(self, 'connections', MappingProxyType(dict(self.connections)))
+    
+    def __reduce__(self):
+        # Mapping proxies can't be pickled, so rebuild from the plain items
+        return (_part_from_items, (self.chip_type, tuple(self.connections.items())))
+
+
+# Tokenizer tables: keywords are just identifiers with a reserved spelling,
+# and every punctuation token is a single character. Token types are always
+# these (interned) literal strings, never slices of the input, so the
+# parser's type comparisons succeed on the identity check.
+_KEYWORDS = {'CHIP': 'CHIP', 'IN': 'IN', 'OUT': 'OUT', 'PARTS': 'PARTS'}
+_PUNCTUATION = {
+    '{': 'LBRACE',
+    '}': 'RBRACE',
+    '(': 'LPAREN',
+    ')': 'RPAREN',
+    ';': 'SEMICOLON',
+    ',': 'COMMA',
+    '=': 'EQUALS',
+    ':': 'COLON',
+}
+
+# One pass over the text in the C matcher: a // comment matches with both
+# groups empty, so it's dropped, and characters no token uses never match.
+_find_tokens = re.compile(r'//[^\n]*|([a-zA-Z_][a-zA-Z0-9_]*)|([{}();,=:])').findall
 
 
 class HDLTokenizer:
     """Breaks HDL text into tokens for parsing."""
     
-    # All the different token types we need to recognize
-    TOKEN_PATTERNS = [
-        ('CHIP', r'\bCHIP\b'),
-        ('IN', r'\bIN\b'),
-        ('OUT', r'\bOUT\b'),
-        ('PARTS', r'\bPARTS\b'),
-        ('IDENTIFIER', r'[a-zA-Z_][a-zA-Z0-9_]*'),
-        ('LBRACE', r'\{'),
-        ('RBRACE', r'\}'),
-        ('LPAREN', r'\('),
-        ('RPAREN', r'\)'),
-        ('SEMICOLON', r';'),
-        ('COMMA', r','),
-        ('EQUALS', r'='),
-        ('COLON', r':'),
-        ('COMMENT', r'//.*'),
-        ('WHITESPACE', r'\s+'),
-        ('NEWLINE', r'\n'),
-    ]
-    
-    def __init__(self):
-        # Build one big regex from all patterns
-        self.token_regex = '|'.join(f'(?P<{name}>{pattern})' 
-                                   for name, pattern in self.TOKEN_PATTERNS)
-        self.regex = re.compile(self.token_regex)
-    
     def tokenize(self, text: str) -> List[Tuple[str, str]]:
         """
         Break HDL text into tokens.
         Returns list of (token_type, token_value) pairs.
         """
-        tokens = []
-        for match in self.regex.finditer(text):
-            token_type = match.lastgroup
-            token_value = match.group()
-            
-            # Skip whitespace and comments - we don't need them
-            if token_type not in ('WHITESPACE', 'COMMENT', 'NEWLINE'):
-                tokens.append((token_type, token_value))
-        
-        return tokens
+        return list(zip(*self.tokenize_columns(text)))
+    
+    def tokenize_columns(self, text: str) -> Tuple[List[str], List[str]]:
+        """
+        Break HDL text into tokens, returned as two parallel lists: token
+        types and token values. This is what the parser reads, since it
+        skips building a tuple per token.
+        
+        Whitespace, // comments and characters no token uses are skipped.
+        """
+        types = []
+        values = []
+        add_type = types.append
+        add_value = values.append
+        keywords = _KEYWORDS.get
+        intern = sys.intern
+        
+        for identifier, char in _find_tokens(text):
+            if identifier:
+                keyword = keywords(identifier)
+                if keyword is not None:
+                    add_type(keyword)
+                    add_value(keyword)
+                else:
+                    # Chip, pin and signal names are interned so the many dict
+                    # lookups on them compare by identity
+                    add_type('IDENTIFIER')
+                    add_value(intern(identifier))
+            elif char:
+                add_type(_PUNCTUATION[char])
+                add_value(char)
+        
+        return types, values
+
+
+# Read-only connection mappings handed out so far, keyed by their (pin,
+# signal) items, so parts wired the same way share one. Emptied when it
+# reaches CONNECTIONS_CACHE_SIZE entries, so it can't grow without bound.
+CONNECTIONS_CACHE_SIZE = 4096
+_CONNECTIONS_CACHE: Dict[Tuple[Tuple[str, str], ...], Mapping[str, str]] = {}
+
+
+def _shared_connections(items: Tuple[Tuple[str, str], ...]) -> Mapping[str, str]:
+    """Get the shared read-only mapping for a part's (pin, signal) items."""
+    connections = _CONNECTIONS_CACHE.get(items)
+    if connections is None:
+        if len(_CONNECTIONS_CACHE) >= CONNECTIONS_CACHE_SIZE:
+            _CONNECTIONS_CACHE.clear()
+        connections = MappingProxyType(dict(items))
+        _CONNECTIONS_CACHE[items] = connections
+    return connections
+
+
+def _part_from_items(chip_type: str, items: Tuple[Tuple[str, str], ...]) -> PartInstance:
+    """Rebuild a pickled PartInstance around a shared connections mapping."""
+    return PartInstance(chip_type, _shared_connections(items))
+
+
+# Each parser remembers the definitions of this many recently parsed texts
+TEXT_CACHE_SIZE = 256
 
 
 class HDLParser:
@@ -79,8 +150,12 @@ class HDLParser:
     
     def __init__(self):
         self.tokenizer = HDLTokenizer()
-        self.tokens = []
+        self.token_types = []
+        self.token_values = []
         self.position = 0
+        # LRU of HDL text -> its parsed definition, so recently seen
+        # sources are only tokenized and parsed once per parser
+        self._text_cache: 'OrderedDict[str, ChipDefinition]' = OrderedDict()
     
     def parse_file(self, filepath: str) -> ChipDefinition:
         """Parse an HDL file and return the chip definition."""
@@ -90,16 +165,37 @@ class HDLParser:
         return self.parse_text(content)
     
     def parse_text(self, text: str) -> ChipDefinition:
-        """Parse HDL text and return the chip definition."""
-        self.tokens = self.tokenizer.tokenize(text)
-        self.position = 0
+        """
+        Parse HDL text and return the chip definition. Parsing a recently
+        seen text again returns the same (shared, read-only) definition.
+        """
+        chip_def = self._text_cache.get(text)
+        if chip_def is not None:
+            self._text_cache.move_to_end(text)
+            return chip_def
         
-        return self._parse_chip()
+        self.token_types, self.token_values = self.tokenizer.tokenize_columns(text)
+        self.position = 0
+        chip_def = self._parse_chip()
+        self._text_cache[text] = chip_def
+        if len(self._text_cache) > TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return chip_def
+    
+    def _token_at(self, position: int) -> Optional[Tuple[str, str]]:
+        """Get the (type, value) token at a position, or None past the end."""
+        if position < len(self.token_types):
+            return (self.token_types[position], self.token_values[position])
+        return None
     
     def _current_token(self) -> Optional[Tuple[str, str]]:
         """Get current token without moving forward."""
-        if self.position < len(self.tokens):
-            return self.tokens[self.position]
+        return self._token_at(self.position)
+    
+    def _current_type(self) -> Optional[str]:
+        """Get the current token's type without moving forward."""
+        if self.position < len(self.token_types):
+            return self.token_types[self.position]
         return None
     
     def _advance(self) -> Optional[Tuple[str, str]]:
@@ -113,10 +209,11 @@ class HDLParser:
         Make sure next token is what we expect, return its value.
         Throws error if wrong token type.
         """
-        token = self._advance()
-        if not token or token[0] != expected_type:
-            raise ValueError(f"Expected {expected_type}, got {token}")
-        return token[1]
+        position = self.position
+        self.position = position + 1
+        if position >= len(self.token_types) or self.token_types[position] != expected_type:
+            raise ValueError(f"Expected {expected_type}, got {self._token_at(position)}")
+        return self.token_values[position]
     
     def _parse_chip(self) -> ChipDefinition:
         """Parse the whole CHIP { ... } block."""
@@ -148,7 +245,7 @@ class HDLParser:
             parts=parts
         )
     
-    def _parse_in_section(self) -> List[str]:
+    def _parse_in_section(self) -> Tuple[str, ...]:
         """Parse IN pin1, pin2, ...; section."""
         self._expect_token('IN')
         
@@ -158,17 +255,16 @@ class HDLParser:
         inputs.append(self._expect_token('IDENTIFIER'))
         
         # Additional pins separated by commas
-        while (self._current_token() and 
-               self._current_token()[0] == 'COMMA'):
-            self._advance()  # eat comma
+        while self._current_type() == 'COMMA':
+            self.position += 1  # eat comma
             inputs.append(self._expect_token('IDENTIFIER'))
         
         # Semicolon at end
         self._expect_token('SEMICOLON')
         
-        return inputs
+        return tuple(inputs)
     
-    def _parse_out_section(self) -> List[str]:
+    def _parse_out_section(self) -> Tuple[str, ...]:
         """Parse OUT pin1, pin2, ...; section."""
         self._expect_token('OUT')
         
@@ -178,17 +274,16 @@ class HDLParser:
         outputs.append(self._expect_token('IDENTIFIER'))
         
         # Additional pins separated by commas
-        while (self._current_token() and 
-               self._current_token()[0] == 'COMMA'):
-            self._advance()  # eat comma
+        while self._current_type() == 'COMMA':
+            self.position += 1  # eat comma
             outputs.append(self._expect_token('IDENTIFIER'))
         
         # Semicolon at end
         self._expect_token('SEMICOLON')
         
-        return outputs
+        return tuple(outputs)
     
-    def _parse_parts_section(self) -> List[PartInstance]:
+    def _parse_parts_section(self) -> Tuple[PartInstance, ...]:
         """Parse PARTS: section with chip instantiations."""
         self._expect_token('PARTS')
         self._expect_token('COLON')
@@ -196,11 +291,10 @@ class HDLParser:
         parts = []
         
         # Keep parsing part instances until we hit closing }
-        while (self._current_token() and 
-               self._current_token()[0] != 'RBRACE'):
+        while self._current_type() not in ('RBRACE', None):
             parts.append(self._parse_part_instance())
         
-        return parts
+        return tuple(parts)
     
     def _parse_part_instance(self) -> PartInstance:
         """Parse single chip instance like: And(a=x, b=y, out=z);"""
@@ -220,9 +314,8 @@ class HDLParser:
         connections[pin_name] = signal_name
         
         # Additional connections separated by commas
-        while (self._current_token() and 
-               self._current_token()[0] == 'COMMA'):
-            self._advance()  # eat comma
+        while self._current_type() == 'COMMA':
+            self.position += 1  # eat comma
             pin_name = self._expect_token('IDENTIFIER')
             self._expect_token('EQUALS')
             signal_name = self._expect_token('IDENTIFIER')
@@ -234,12 +327,17 @@ class HDLParser:
         # Semicolon at end
         self._expect_token('SEMICOLON')
         
+        # Parts wired identically (in the same pin order) share one mapping
         return PartInstance(
             chip_type=chip_type,
-            connections=connections
+            connections=_shared_connections(tuple(connections.items()))
         )
 
 
+# Parser reused by parse_hdl_file; parse_text resets its state on every call
+_DEFAULT_PARSER = HDLParser()
+
+
 def parse_hdl_file(filepath: str) -> ChipDefinition:
     """
     Convenience function to parse an HDL file.
@@ -249,9 +347,11 @@ def parse_hdl_file(filepath: str) -> ChipDefinition:
         
     Returns:
         ChipDefinition object representing the parsed chip
+    
+    The file is always read; use chip_simulator.load_chip_definition to
+    skip files that haven't changed since they were last parsed.
     """
-    parser = HDLParser()
-    return parser.parse_file(filepath)
+    return _DEFAULT_PARSER.parse_file(filepath)
 
 
 # Example usage and testing
@@ -276,4 +376,4 @@ if __name__ == "__main__":
     print(f"Outputs: {chip_def.outputs}")
     print(f"Parts: {len(chip_def.parts)}")
     for i, part in enumerate(chip_def.parts):
-        print(f"  Part {i+1}: {part.chip_type} - {part.connections}") 
\ No newline at end of file
+        print(f"  Part {i+1}: {part.chip_type} - {dict(part.connections)}") 
\ No newline at end of file
@@ -9,7 +9,7 @@ Author: HDL Parser Framework
 Course: Nand2Tetris 2025 Spring
 """
 
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, FrozenSet, List, Optional, Any, Sequence, Tuple
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 from enum import Enum
@@ -29,7 +29,13 @@ class PinType(Enum):
     INTERNAL = "internal"
 
 
-@dataclass(frozen=True)
+# Values a signal can hold, and the ones a pin may be created with (None
+# means not driven yet). Same frozenset checks as the test models use.
+_VALID_BITS = frozenset((0, 1))
+_VALID_PIN_VALUES = _VALID_BITS | {None}
+
+
+@dataclass(frozen=True, slots=True)
 class Pin:
     """Represents a pin (input, output, or internal signal)."""
     name: str
@@ -38,13 +44,13 @@ class Pin:
     
     def __post_init__(self):
         """Validate pin after initialization."""
-        if not self.name or not self.name.strip():
+        if not isinstance(self.name, str) or not self.name.strip():
             raise ValueError("Pin name cannot be empty")
-        if self.value is not None and self.value not in (0, 1):
+        if self.value not in _VALID_PIN_VALUES:
             raise ValueError(f"Pin value must be 0 or 1, got {self.value}")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Connection:
     """Represents a connection between pins."""
     source_pin: str
@@ -56,7 +62,7 @@ class Connection:
             raise ValueError("Connection pins cannot be empty")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PartInstance:
     """Represents an instance of a part within a chip."""
     chip_type: str
@@ -69,10 +75,6 @@ class PartInstance:
             raise ValueError("Chip type cannot be empty")
         if not self.connections:
             raise ValueError("Part must have at least one connection")
-        
-        # Set default instance name if not provided
-        if self.instance_name is None:
-            object.__setattr__(self, 'instance_name', f"{self.chip_type.lower()}1")
     
     @property
     def input_connections(self) -> Dict[str, str]:
@@ -87,21 +89,59 @@ class PartInstance:
         return self.connections
 
 
-@dataclass
+def _default_instance_name(slot) -> property:
+    """
+    Wrap the instance_name slot so a part built without a name reads as
+    "<chip type>1". Nothing is stored; the field keeps holding None.
+    """
+    def get_instance_name(part: PartInstance) -> str:
+        instance_name = slot.__get__(part)
+        if instance_name is None:
+            return f"{part.chip_type.lower()}1"
+        return instance_name
+    
+    return property(get_instance_name, slot.__set__, doc="Name of the part, defaulting to its chip type.")
+
+
+PartInstance.instance_name = _default_instance_name(PartInstance.instance_name)
+
+
+@dataclass(frozen=True, slots=True)
 class ChipDefinition:
-    """Represents a complete chip definition with validation."""
+    """
+    Represents a complete chip definition with validation.
+    Like the parser's ChipDefinition, pins and parts are stored as tuples and
+    a definition can't be changed after it is built, so the pin and signal
+    sets worked out here stay correct.
+    """
     name: str
-    inputs: List[str]
-    outputs: List[str]
-    parts: List[PartInstance] = field(default_factory=list)
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    parts: Tuple[PartInstance, ...] = ()
     chip_type: ChipType = ChipType.CUSTOM
     description: Optional[str] = None
+    # All pin names as a tuple and as a set for membership checks, filled in
+    # by _validate_pins
+    _all_pins: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _all_pins_set: FrozenSet[str] = field(default=frozenset(), init=False, repr=False, compare=False)
+    # Signals the parts wire up that aren't chip pins, found once the parts are
+    _internal_signals: FrozenSet[str] = field(default=frozenset(), init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Validate chip definition after initialization."""
+        # Accept any sequence from callers, but store it read-only
+        for field_name in ('inputs', 'outputs', 'parts'):
+            value = getattr(self, field_name)
+            if type(value) is not tuple:
+                object.__setattr__(self, field_name, tuple(value))
         self._validate_name()
         self._validate_pins()
         self._validate_parts()
+        all_pins = self._all_pins_set
+        object.__setattr__(self, '_internal_signals', frozenset(signal_name
+                                                                for part in self.parts
+                                                                for signal_name in part.connections.values()
+                                                                if signal_name not in all_pins))
     
     def _validate_name(self):
         """Validate chip name."""
@@ -128,6 +168,9 @@ class ChipDefinition:
                 raise ValueError("Pin name cannot be empty")
             if not pin_name.isidentifier():
                 raise ValueError(f"Pin name '{pin_name}' is not a valid identifier")
+        
+        object.__setattr__(self, '_all_pins', all_pins)
+        object.__setattr__(self, '_all_pins_set', frozenset(all_pins))
     
     def _validate_parts(self):
         """Validate part instances."""
@@ -138,75 +181,52 @@ class ChipDefinition:
             instance_names.add(part.instance_name)
     
     @property
-    def all_pins(self) -> List[str]:
+    def all_pins(self) -> Tuple[str, ...]:
         """Get all pin names (inputs + outputs)."""
-        return self.inputs + self.outputs
+        return self._all_pins
     
     @property
     def is_builtin(self) -> bool:
         """Check if this is a built-in chip."""
-        return self.chip_type == ChipType.BUILTIN
+        return self.chip_type is ChipType.BUILTIN
     
     @property
     def is_composite(self) -> bool:
         """Check if this is a composite chip."""
         return len(self.parts) > 0
     
-    def get_internal_signals(self) -> Set[str]:
-        """Get all internal signal names used in connections."""
-        internal_signals = set()
-        
-        for part in self.parts:
-            for signal_name in part.connections.values():
-                if signal_name not in self.all_pins:
-                    internal_signals.add(signal_name)
-        
-        return internal_signals
+    def get_internal_signals(self) -> FrozenSet[str]:
+        """Get all internal signal names used in connections, found when the chip was built."""
+        return self._internal_signals
     
     def validate_connections(self) -> List[str]:
         """Validate all connections and return list of any issues found."""
         issues = []
-        all_pins = set(self.all_pins)
+        all_pins = self._all_pins_set
         
-        # Get all signals used in connections
-        used_signals = set()
-        for part in self.parts:
-            for signal_name in part.connections.values():
-                used_signals.add(signal_name)
-        
-        # Get signals that are properly defined (either chip pins or internal signals)
-        # Internal signals must be outputs of some part and inputs to other parts
-        signal_sources = {}  # signal -> list of parts that output it
-        signal_sinks = {}    # signal -> list of parts that input it
-        
-        # Analyze signal flow
+        # One pass over every connection, splitting signals into those some
+        # part outputs and those only read. For now, we'll assume pins ending
+        # with 'out' are outputs. This is a simplification - in real
+        # implementation we'd need chip metadata
+        produced = set()
+        consumed = {}  # Insertion-ordered, so issues come out in wiring order
         for part in self.parts:
             for pin_name, signal_name in part.connections.items():
-                # For now, we'll assume connections ending with 'out' are outputs
-                # This is a simplification - in real implementation we'd need chip metadata
-                if pin_name.endswith('out') or pin_name == 'out':
-                    if signal_name not in signal_sources:
-                        signal_sources[signal_name] = []
-                    signal_sources[signal_name].append(part.instance_name)
+                if pin_name.endswith('out'):
+                    produced.add(signal_name)
                 else:
-                    if signal_name not in signal_sinks:
-                        signal_sinks[signal_name] = []
-                    signal_sinks[signal_name].append(part.instance_name)
+                    consumed[signal_name] = None
         
-        # Validate each signal
-        for signal_name in used_signals:
-            if signal_name in all_pins:
-                continue  # Chip pins are always valid
-            
-            # For internal signals, check if they have proper sources
-            if signal_name not in signal_sources:
+        # Chip pins are always valid; any other signal needs a part producing it
+        for signal_name in consumed:
+            if signal_name not in all_pins and signal_name not in produced:
                 # This signal is used but never produced
                 issues.append(f"Signal '{signal_name}' is used but never produced by any part")
         
         return issues
 
 
-@dataclass
+@dataclass(slots=True)
 class SimulationState:
     """Represents the state of a chip simulation."""
     chip_name: str
@@ -218,7 +238,7 @@ class SimulationState:
     
     def set_input(self, pin_name: str, value: int):
         """Set an input value with validation."""
-        if value not in (0, 1):
+        if value not in _VALID_BITS:
             raise ValueError(f"Input value must be 0 or 1, got {value}")
         self.input_values[pin_name] = value
     
@@ -226,20 +246,27 @@ class SimulationState:
         """Get an output value."""
         return self.output_values.get(pin_name)
     
+    def set_output(self, pin_name: str, value: int):
+        """Set an output value with validation."""
+        if value not in _VALID_BITS:
+            raise ValueError(f"Output value must be 0 or 1, got {value}")
+        self.output_values[pin_name] = value
+    
     def set_internal_signal(self, signal_name: str, value: int):
         """Set an internal signal value."""
-        if value not in (0, 1):
+        if value not in _VALID_BITS:
             raise ValueError(f"Signal value must be 0 or 1, got {value}")
         self.internal_signals[signal_name] = value
     
     def get_signal_value(self, signal_name: str) -> Optional[int]:
-        """Get any signal value (input, output, or internal)."""
-        if signal_name in self.input_values:
-            return self.input_values[signal_name]
-        elif signal_name in self.output_values:
-            return self.output_values[signal_name]
-        elif signal_name in self.internal_signals:
-            return self.internal_signals[signal_name]
+        """
+        Get any signal value (input, output, or internal). Inputs win over
+        outputs, which win over internal signals.
+        """
+        for values in (self.input_values, self.output_values, self.internal_signals):
+            value = values.get(signal_name)
+            if value is not None:
+                return value
         return None
     
     def clear_outputs_and_internals(self):
@@ -276,14 +303,17 @@ class BuiltinChipEvaluator(ChipEvaluator):
     
     def __init__(self, name: str, inputs: List[str], outputs: List[str]):
         self.name = name
-        self.inputs = inputs
-        self.outputs = outputs
+        # Own copies, handed out as-is by the getters below
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
     
     def get_input_pins(self) -> List[str]:
-        return self.inputs.copy()
+        """Get the input pin names. The list is shared, so don't modify it."""
+        return self.inputs
     
     def get_output_pins(self) -> List[str]:
-        return self.outputs.copy()
+        """Get the output pin names. The list is shared, so don't modify it."""
+        return self.outputs
 
 
 # Factory function for creating chip definitions
@@ -302,7 +332,7 @@ def create_builtin_chip_definition(name: str, inputs: List[str], outputs: List[s
 
 
 def create_custom_chip_definition(name: str, inputs: List[str], outputs: List[str],
-                                parts: List[PartInstance], 
+                                parts: Sequence[PartInstance], 
                                 description: Optional[str] = None) -> ChipDefinition:
     """Factory function to create custom chip definitions."""
     return ChipDefinition(
@@ -8,11 +8,19 @@ Author: HDL Parser Framework
 Course: Nand2Tetris 2025 Spring
 """
 
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
-from datetime import datetime
-import json
+from datetime import datetime, timedelta
+from itertools import chain, compress
+import sys
+import time
+
+
+# Values a pin can hold
+_VALID_BITS = frozenset((0, 1))
+
+_now = datetime.now
 
 
 class TestStatus(Enum):
@@ -25,6 +33,20 @@ class TestStatus(Enum):
     SKIPPED = "skipped"
 
 
+# Symbol shown for each status in reports
+_STATUS_SYMBOLS: Dict[TestStatus, str] = {
+    TestStatus.PASSED: "✓",
+    TestStatus.FAILED: "✗",
+    TestStatus.ERROR: "⚠",
+    TestStatus.SKIPPED: "⊝",
+    TestStatus.PENDING: "○",
+    TestStatus.RUNNING: "⟳"
+}
+
+# Serialized form of each status, looked up instead of going through .value
+_STATUS_VALUES: Dict[TestStatus, str] = {status: status.value for status in TestStatus}
+
+
 class TestFormat(Enum):
     """Enumeration of supported test file formats."""
     CSV = "csv"
@@ -32,7 +54,7 @@ class TestFormat(Enum):
     JSON = "json"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TestVector:
     """Represents a single test case with inputs and expected outputs."""
     test_id: str
@@ -55,14 +77,14 @@ class TestVector:
         for pin_name, value in self.inputs.items():
             if not pin_name or not pin_name.strip():
                 raise ValueError("Input pin name cannot be empty")
-            if value not in (0, 1):
+            if value not in _VALID_BITS:
                 raise ValueError(f"Input value must be 0 or 1, got {value} for pin {pin_name}")
         
         # Validate expected output values
         for pin_name, value in self.expected_outputs.items():
             if not pin_name or not pin_name.strip():
                 raise ValueError("Output pin name cannot be empty")
-            if value not in (0, 1):
+            if value not in _VALID_BITS:
                 raise ValueError(f"Expected output value must be 0 or 1, got {value} for pin {pin_name}")
     
     @property
@@ -82,9 +104,52 @@ class TestVector:
     def format_expected_outputs(self) -> str:
         """Format expected outputs as a readable string."""
         return ", ".join(f"{pin}={value}" for pin, value in self.expected_outputs.items())
+    
+    def to_packed(self, input_pins: Sequence[str], output_pins: Sequence[str]) -> 'BitPackedTestVector':
+        """Pack this vector's values into bitmasks, pin i of each list going to bit i."""
+        return BitPackedTestVector(
+            test_id=self.test_id,
+            input_mask=_pack_pins(self.inputs, input_pins),
+            output_mask=_pack_pins(self.expected_outputs, output_pins)
+        )
+
+
+def _pack_pins(values: Dict[str, int], pins: Sequence[str]) -> int:
+    """Pack pin values into an int, the value of pins[i] going to bit i."""
+    mask = 0
+    for bit, pin in enumerate(pins):
+        if values[pin]:
+            mask |= 1 << bit
+    return mask
+
+
+@dataclass(frozen=True, slots=True)
+class BitPackedTestVector:
+    """
+    Compact form of a TestVector for bulk simulation: one int of input bits
+    and one of expected output bits. The pin order behind the bits lives on
+    the TestSuite (input_pins / output_pins), not on each vector.
+    """
+    test_id: str
+    input_mask: int
+    output_mask: int
+    
+    def get_differences(self, actual_mask: int, output_pins: Sequence[str]) -> Dict[str, Dict[str, int]]:
+        """Get differences between expected and actual output bits, by pin name."""
+        differences = {}
+        diff = actual_mask ^ self.output_mask
+        while diff:
+            lowest = diff & -diff
+            pin_name = output_pins[lowest.bit_length() - 1]
+            differences[pin_name] = {
+                'expected': 1 if self.output_mask & lowest else 0,
+                'actual': 1 if actual_mask & lowest else 0
+            }
+            diff ^= lowest
+        return differences
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     """Represents the result of executing a single test case."""
     test_vector: TestVector
@@ -92,27 +157,27 @@ class TestResult:
     status: TestStatus = TestStatus.PENDING
     error_message: Optional[str] = None
     execution_time_ms: Optional[float] = None
+    # Filled in from _created_ns the first time it's read (see below the class)
     timestamp: Optional[datetime] = None
-    
-    def __post_init__(self):
-        """Set default timestamp if not provided."""
-        if self.timestamp is None:
-            self.timestamp = datetime.now()
+    # Wall-clock creation time, which is much cheaper to read than datetime.now()
+    _created_ns: int = field(default_factory=time.time_ns, init=False, repr=False, compare=False)
+    # (timestamp, its ISO form) built by the first to_dict call
+    _timestamp_iso_cache: Optional[Tuple[datetime, str]] = field(default=None, init=False, repr=False, compare=False)
     
     @property
     def passed(self) -> bool:
         """Check if the test passed."""
-        return self.status == TestStatus.PASSED
+        return self.status is TestStatus.PASSED
     
     @property
     def failed(self) -> bool:
         """Check if the test failed."""
-        return self.status == TestStatus.FAILED
+        return self.status is TestStatus.FAILED
     
     @property
     def has_error(self) -> bool:
         """Check if the test encountered an error."""
-        return self.status == TestStatus.ERROR
+        return self.status is TestStatus.ERROR
     
     def mark_passed(self):
         """Mark the test as passed."""
@@ -129,19 +194,25 @@ class TestResult:
         self.status = TestStatus.ERROR
         self.error_message = error
     
+    def get_difference_rows(self) -> List[Tuple[str, int, Optional[int]]]:
+        """
+        Get (pin, expected, actual) for every mismatched output, in output
+        order. actual is None when the output was not produced at all.
+        """
+        get_actual = self.actual_outputs.get
+        return [(pin_name, expected_value, actual_value)
+                for pin_name, expected_value in self.test_vector.expected_outputs.items()
+                if (actual_value := get_actual(pin_name)) != expected_value]
+    
     def get_differences(self) -> Dict[str, Dict[str, int]]:
         """Get differences between expected and actual outputs."""
-        differences = {}
-        
-        for pin_name, expected_value in self.test_vector.expected_outputs.items():
-            actual_value = self.actual_outputs.get(pin_name)
-            if actual_value != expected_value:
-                differences[pin_name] = {
-                    'expected': expected_value,
-                    'actual': actual_value if actual_value is not None else -1
-                }
-        
-        return differences
+        return {
+            pin_name: {
+                'expected': expected_value,
+                'actual': actual_value if actual_value is not None else -1
+            }
+            for pin_name, expected_value, actual_value in self.get_difference_rows()
+        }
     
     def format_actual_outputs(self) -> str:
         """Format actual outputs as a readable string."""
@@ -151,15 +222,15 @@ class TestResult:
     
     def get_status_symbol(self) -> str:
         """Get a visual symbol for the test status."""
-        status_symbols = {
-            TestStatus.PASSED: "✓",
-            TestStatus.FAILED: "✗",
-            TestStatus.ERROR: "⚠",
-            TestStatus.SKIPPED: "⊝",
-            TestStatus.PENDING: "○",
-            TestStatus.RUNNING: "⟳"
-        }
-        return status_symbols.get(self.status, "?")
+        return _STATUS_SYMBOLS.get(self.status, "?")
+    
+    def _timestamp_iso(self) -> str:
+        """Get the timestamp in ISO format, only formatting it again if it was replaced."""
+        timestamp = self.timestamp
+        cached = self._timestamp_iso_cache
+        if cached is None or cached[0] is not timestamp:
+            cached = self._timestamp_iso_cache = (timestamp, timestamp.isoformat())
+        return cached[1]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert test result to dictionary for serialization."""
@@ -168,15 +239,34 @@ class TestResult:
             'inputs': self.test_vector.inputs,
             'expected_outputs': self.test_vector.expected_outputs,
             'actual_outputs': self.actual_outputs,
-            'status': self.status.value,
+            'status': _STATUS_VALUES[self.status],
             'error_message': self.error_message,
             'execution_time_ms': self.execution_time_ms,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'timestamp': self._timestamp_iso(),
             'differences': self.get_differences()
         }
 
 
-@dataclass
+def _lazy_timestamp(slot) -> property:
+    """
+    Wrap the timestamp slot so a result left without one gets its creation
+    time on first read. It stays a regular dataclass field (in fields(),
+    repr, comparisons and replace()); building a result never makes a datetime.
+    """
+    def get_timestamp(result: TestResult) -> datetime:
+        timestamp = slot.__get__(result)
+        if timestamp is None:
+            timestamp = datetime.fromtimestamp(result._created_ns / 1e9)
+            slot.__set__(result, timestamp)
+        return timestamp
+    
+    return property(get_timestamp, slot.__set__, doc="When the result was created, unless given explicitly.")
+
+
+TestResult.timestamp = _lazy_timestamp(TestResult.timestamp)
+
+
+@dataclass(slots=True)
 class TestSuite:
     """Represents a complete test suite for a chip."""
     chip_name: str
@@ -186,6 +276,10 @@ class TestSuite:
     description: Optional[str] = None
     source_file: Optional[str] = None
     format_type: TestFormat = TestFormat.CSV
+    # test_id -> vector, built by the first get_test_by_id call
+    _id_index: Optional[Dict[str, TestVector]] = field(default=None, init=False, repr=False, compare=False)
+    # input pin -> its value in every vector, in order, built by filter_by_input
+    _input_columns: Dict[str, Tuple[int, ...]] = field(default_factory=dict, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Validate and initialize test suite."""
@@ -201,6 +295,7 @@ class TestSuite:
         
         # Validate consistency
         self._validate_consistency()
+        self._intern_names()
     
     def _detect_pins(self):
         """Automatically detect input and output pins from test vectors."""
@@ -213,20 +308,82 @@ class TestSuite:
     
     def _validate_consistency(self):
         """Validate that all test vectors have consistent pins."""
-        expected_inputs = set(self.input_pins)
-        expected_outputs = set(self.output_pins)
+        expected_inputs = frozenset(self.input_pins)
+        expected_outputs = frozenset(self.output_pins)
         
+        # dict keys views compare equal to sets directly, so no per-vector copies
         for i, vector in enumerate(self.test_vectors):
-            vector_inputs = set(vector.input_pins)
-            vector_outputs = set(vector.output_pins)
-            
-            if vector_inputs != expected_inputs:
+            if vector.inputs.keys() != expected_inputs:
                 raise ValueError(f"Test vector {i} has inconsistent input pins: "
-                               f"expected {expected_inputs}, got {vector_inputs}")
+                               f"expected {set(expected_inputs)}, got {set(vector.inputs)}")
             
-            if vector_outputs != expected_outputs:
+            if vector.expected_outputs.keys() != expected_outputs:
                 raise ValueError(f"Test vector {i} has inconsistent output pins: "
-                               f"expected {expected_outputs}, got {vector_outputs}")
+                               f"expected {set(expected_outputs)}, got {set(vector.expected_outputs)}")
+    
+    def _intern_names(self):
+        """
+        Intern the chip name and pin lists, once per suite. Vectors from
+        from_rows() or the test file parser are built with interned names
+        already, so their dict keys are these same string objects; vectors
+        passed in by callers are left as they are.
+        """
+        self.chip_name = sys.intern(self.chip_name)
+        self.input_pins = [sys.intern(pin) for pin in self.input_pins]
+        self.output_pins = [sys.intern(pin) for pin in self.output_pins]
+    
+    @classmethod
+    def from_rows(cls, chip_name: str, input_pins: List[str], output_pins: List[str],
+                  input_rows: Sequence[Sequence[int]], output_rows: Sequence[Sequence[int]],
+                  source_file: Optional[str] = None) -> 'TestSuite':
+        """
+        Build a suite from rows of input and output values, in pin order.
+        
+        Everything TestVector.__post_init__ would check per vector is checked
+        once for the whole table instead (pin names once, all values in one
+        set pass), then the vectors are built without re-running it, with
+        interned pin names and test IDs "test1", "test2", ...
+        """
+        for pin_name in list(input_pins) + list(output_pins):
+            if not pin_name or not pin_name.strip():
+                raise ValueError("Pin name cannot be empty")
+        if not input_pins:
+            raise ValueError("Test vector must have at least one input")
+        if not output_pins:
+            raise ValueError("Test vector must have at least one expected output")
+        if len(input_rows) != len(output_rows):
+            raise ValueError(f"Got {len(input_rows)} input rows but {len(output_rows)} output rows")
+        
+        for rows, pins in ((input_rows, input_pins), (output_rows, output_pins)):
+            for i, row in enumerate(rows):
+                if len(row) != len(pins):
+                    raise ValueError(f"Row {i} has {len(row)} values, expected {len(pins)}")
+            bad_values = set(chain.from_iterable(rows)) - _VALID_BITS
+            if bad_values:
+                raise ValueError(f"Pin values must be 0 or 1, got {sorted(bad_values, key=repr)}")
+        
+        intern = sys.intern
+        input_pins = [intern(pin) for pin in input_pins]
+        output_pins = [intern(pin) for pin in output_pins]
+        
+        new_vector = object.__new__
+        set_field = object.__setattr__
+        vectors = []
+        for i, (input_row, output_row) in enumerate(zip(input_rows, output_rows), 1):
+            vector = new_vector(TestVector)
+            set_field(vector, 'test_id', intern(f"test{i}"))
+            set_field(vector, 'inputs', dict(zip(input_pins, input_row)))
+            set_field(vector, 'expected_outputs', dict(zip(output_pins, output_row)))
+            set_field(vector, 'description', None)
+            vectors.append(vector)
+        
+        return cls(
+            chip_name=chip_name,
+            test_vectors=vectors,
+            input_pins=input_pins,
+            output_pins=output_pins,
+            source_file=source_file
+        )
     
     @property
     def test_count(self) -> int:
@@ -238,16 +395,45 @@ class TestSuite:
         """Get all pin names (inputs + outputs)."""
         return self.input_pins + self.output_pins
     
+    def to_packed(self) -> List[BitPackedTestVector]:
+        """Pack every test vector against this suite's pin order."""
+        return [vector.to_packed(self.input_pins, self.output_pins) for vector in self.test_vectors]
+    
     def get_test_by_id(self, test_id: str) -> Optional[TestVector]:
-        """Get a test vector by its ID."""
-        for vector in self.test_vectors:
-            if vector.test_id == test_id:
-                return vector
-        return None
+        """
+        Get a test vector by its ID (the first one, if IDs repeat).
+        The lookup index is built on the first call, so changes made to
+        test_vectors after that aren't seen.
+        """
+        if self._id_index is None:
+            index = {}
+            for vector in self.test_vectors:
+                index.setdefault(vector.test_id, vector)
+            self._id_index = index
+        return self._id_index.get(test_id)
     
     def filter_tests(self, predicate) -> 'TestSuite':
         """Create a new test suite with filtered test vectors."""
-        filtered_vectors = [v for v in self.test_vectors if predicate(v)]
+        return self._with_vectors([v for v in self.test_vectors if predicate(v)])
+    
+    def filter_by_input(self, pin: str, value: int) -> 'TestSuite':
+        """
+        Create a new test suite with the vectors whose input `pin` is `value`.
+        Same result as filter_tests(lambda v: v.inputs[pin] == value), but the
+        pin's values are read into a column once, so later filters on that pin
+        skip the per-vector dict lookups. Like get_test_by_id, changes made to
+        test_vectors after the first call aren't seen.
+        """
+        column = self._input_columns.get(pin)
+        if column is None:
+            if pin not in self.input_pins:
+                raise ValueError(f"Unknown input pin '{pin}' for chip {self.chip_name}")
+            column = tuple(vector.inputs[pin] for vector in self.test_vectors)
+            self._input_columns[pin] = column
+        return self._with_vectors(list(compress(self.test_vectors, [bit == value for bit in column])))
+    
+    def _with_vectors(self, filtered_vectors: List[TestVector]) -> 'TestSuite':
+        """Create a test suite like this one, holding the given vectors."""
         return TestSuite(
             chip_name=self.chip_name,
             test_vectors=filtered_vectors,
@@ -259,7 +445,7 @@ class TestSuite:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class TestReport:
     """Represents a complete test execution report."""
     chip_name: str
@@ -268,22 +454,77 @@ class TestReport:
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     total_execution_time_ms: Optional[float] = None
+    # Pass count and failed/error partitions over the first _counted results,
+    # kept up to date by add_result. Reads recount when results were appended
+    # to test_results directly; status changes need refresh_counters().
+    _passed: int = field(default=0, init=False, repr=False, compare=False)
+    _failed: List[TestResult] = field(default_factory=list, init=False, repr=False, compare=False)
+    _errored: List[TestResult] = field(default_factory=list, init=False, repr=False, compare=False)
+    _counted: int = field(default=0, init=False, repr=False, compare=False)
+    # (start_time, end_time, start ISO, end ISO) formatted by finish()
+    _iso_times: Optional[Tuple[datetime, datetime, str, str]] = field(default=None, init=False, repr=False, compare=False)
+    # (start_time, perf_counter_ns reading) when the report filled in its own
+    # start time, so finish() can time the run on the monotonic clock
+    _start_mark: Optional[Tuple[datetime, int]] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Initialize report with default start time."""
         if self.start_time is None:
-            self.start_time = datetime.now()
+            self.start_time = _now()
+            self._start_mark = (self.start_time, time.perf_counter_ns())
+        self.refresh_counters()
     
     def add_result(self, result: TestResult):
         """Add a test result to the report."""
         self.test_results.append(result)
+        if self._counted == len(self.test_results) - 1:
+            self._count(result)
+            self._counted += 1
+    
+    def _count(self, result: TestResult):
+        """Add one result to the pass count or the failed/error lists."""
+        status = result.status
+        if status is TestStatus.PASSED:
+            self._passed += 1
+        elif status is TestStatus.FAILED:
+            self._failed.append(result)
+        elif status is TestStatus.ERROR:
+            self._errored.append(result)
+    
+    def refresh_counters(self):
+        """Recount statuses, for results whose status changed after add_result."""
+        self._passed = 0
+        self._failed = []
+        self._errored = []
+        for result in self.test_results:
+            self._count(result)
+        self._counted = len(self.test_results)
+    
+    def _sync(self):
+        """Recount if results were appended to test_results directly."""
+        if self._counted != len(self.test_results):
+            self.refresh_counters()
     
     def finish(self):
-        """Mark the report as finished and calculate total time."""
-        self.end_time = datetime.now()
+        """
+        Mark the report as finished and calculate total time. When the report
+        set its own start time (and it hasn't been replaced since), the time is
+        read from the monotonic counter and end_time is placed that long after
+        start_time; otherwise both come from the wall clock.
+        """
+        mark = self._start_mark
+        if mark is not None and mark[0] is self.start_time:
+            elapsed_ns = time.perf_counter_ns() - mark[1]
+            self.end_time = self.start_time + timedelta(microseconds=elapsed_ns // 1000)
+            self.total_execution_time_ms = elapsed_ns / 1e6
+        else:
+            self.end_time = _now()
+            if self.start_time:
+                delta = self.end_time - self.start_time
+                self.total_execution_time_ms = delta.total_seconds() * 1000
         if self.start_time:
-            delta = self.end_time - self.start_time
-            self.total_execution_time_ms = delta.total_seconds() * 1000
+            self._iso_times = (self.start_time, self.end_time,
+                               self.start_time.isoformat(), self.end_time.isoformat())
     
     @property
     def total_tests(self) -> int:
@@ -293,24 +534,28 @@ class TestReport:
     @property
     def passed_tests(self) -> int:
         """Get number of passed tests."""
-        return sum(1 for result in self.test_results if result.passed)
+        self._sync()
+        return self._passed
     
     @property
     def failed_tests(self) -> int:
         """Get number of failed tests."""
-        return sum(1 for result in self.test_results if result.failed)
+        self._sync()
+        return len(self._failed)
     
     @property
     def error_tests(self) -> int:
         """Get number of tests with errors."""
-        return sum(1 for result in self.test_results if result.has_error)
+        self._sync()
+        return len(self._errored)
     
     @property
     def pass_rate(self) -> float:
         """Get pass rate as percentage."""
-        if self.total_tests == 0:
+        total = len(self.test_results)
+        if total == 0:
             return 0.0
-        return (self.passed_tests / self.total_tests) * 100
+        return (self.passed_tests / total) * 100
     
     @property
     def all_passed(self) -> bool:
@@ -318,15 +563,24 @@ class TestReport:
         return self.passed_tests == self.total_tests and self.total_tests > 0
     
     def get_failed_results(self) -> List[TestResult]:
-        """Get all failed test results."""
-        return [result for result in self.test_results if result.failed]
+        """Get all failed test results. The list is shared, so don't modify it."""
+        self._sync()
+        return self._failed
     
     def get_error_results(self) -> List[TestResult]:
-        """Get all test results with errors."""
-        return [result for result in self.test_results if result.has_error]
+        """Get all test results with errors. The list is shared, so don't modify it."""
+        self._sync()
+        return self._errored
     
     def to_summary_dict(self) -> Dict[str, Any]:
         """Convert report to summary dictionary."""
+        iso_times = self._iso_times
+        if iso_times is not None and iso_times[0] is self.start_time and iso_times[1] is self.end_time:
+            start_iso, end_iso = iso_times[2], iso_times[3]
+        else:
+            start_iso = self.start_time.isoformat() if self.start_time else None
+            end_iso = self.end_time.isoformat() if self.end_time else None
+        
         return {
             'chip_name': self.chip_name,
             'total_tests': self.total_tests,
@@ -336,8 +590,8 @@ class TestReport:
             'pass_rate': self.pass_rate,
             'all_passed': self.all_passed,
             'execution_time_ms': self.total_execution_time_ms,
-            'start_time': self.start_time.isoformat() if self.start_time else None,
-            'end_time': self.end_time.isoformat() if self.end_time else None
+            'start_time': start_iso,
+            'end_time': end_iso
         }
     
     def to_detailed_dict(self) -> Dict[str, Any]:
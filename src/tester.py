@@ -4,21 +4,73 @@ Testing Framework - reads test files and runs chip tests
 Parses CSV test files and compares expected vs actual outputs.
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
 from dataclasses import dataclass
-import csv
+import contextlib
 import io
+import os
+import sys
+from itertools import repeat
+from .bits import pack_bits, unpack_bits
 from .chip_simulator import ChipSimulator
 
 
-@dataclass
+# Test values that are a bare bit, looked up instead of parsed
+_bit_value = {'0': 0, '1': 1}.__getitem__
+
+
+@dataclass(slots=True, init=False, repr=False)
 class TestCase:
-    """Single test case with inputs and expected outputs."""
-    inputs: Dict[str, int]
-    expected_outputs: Dict[str, int]
+    """
+    Single test case with inputs and expected outputs.
+    Values are kept as tuples in pin order, with the pin lists shared by every
+    case of a suite; the inputs/expected_outputs dicts are built on demand.
+    """
+    input_values: Tuple[int, ...]
+    output_values: Tuple[int, ...]
+    input_pins: Sequence[str]
+    output_pins: Sequence[str]
+    
+    def __init__(self, inputs: Dict[str, int], expected_outputs: Dict[str, int]):
+        self.inputs = inputs
+        self.expected_outputs = expected_outputs
+    
+    @classmethod
+    def _from_values(cls, input_values: Tuple[int, ...], output_values: Tuple[int, ...],
+                     input_pins: Sequence[str], output_pins: Sequence[str]) -> 'TestCase':
+        """Create a test case from value tuples, sharing the suite's pin lists."""
+        test_case = cls.__new__(cls)
+        test_case.input_values = input_values
+        test_case.output_values = output_values
+        test_case.input_pins = input_pins
+        test_case.output_pins = output_pins
+        return test_case
+    
+    @property
+    def inputs(self) -> Dict[str, int]:
+        """Get the input values by pin name."""
+        return dict(zip(self.input_pins, self.input_values))
+    
+    @inputs.setter
+    def inputs(self, inputs: Dict[str, int]) -> None:
+        self.input_pins = list(inputs)
+        self.input_values = tuple(inputs.values())
+    
+    @property
+    def expected_outputs(self) -> Dict[str, int]:
+        """Get the expected output values by pin name."""
+        return dict(zip(self.output_pins, self.output_values))
+    
+    @expected_outputs.setter
+    def expected_outputs(self, expected_outputs: Dict[str, int]) -> None:
+        self.output_pins = list(expected_outputs)
+        self.output_values = tuple(expected_outputs.values())
+    
+    def __repr__(self) -> str:
+        return f"TestCase(inputs={self.inputs!r}, expected_outputs={self.expected_outputs!r})"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     """Result of running one test case."""
     test_case: TestCase
@@ -27,7 +79,7 @@ class TestResult:
     message: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TestSuite:
     """Collection of test cases for one chip."""
     chip_name: str
@@ -41,28 +93,26 @@ class TestVectorParser:
     
     def parse_file(self, filepath: str) -> TestSuite:
         """Parse a test file and return all test cases."""
+        # Read line by line rather than holding the whole file and its line list
         with open(filepath, 'r') as file:
-            content = file.read()
-        
-        return self.parse_text(content, filepath)
+            return self._parse_lines(file, filepath)
     
     def parse_text(self, text: str, source_name: str = "test") -> TestSuite:
         """Parse test content from string."""
-        lines = text.strip().split('\n')
-        if not lines:
-            raise ValueError("Empty test file")
-        
-        # First line is header: "a,b;out"
-        header = lines[0].strip()
-        input_pins, output_pins = self._parse_header(header)
-        
-        # Rest are test cases
-        test_cases = []
-        for i, line in enumerate(lines[1:], start=2):
-            line = line.strip()
-            if line:  # Skip empty lines
-                test_case = self._parse_test_case(line, input_pins, output_pins, i)
-                test_cases.append(test_case)
+        return self._parse_lines(text.splitlines(), source_name)
+    
+    def iter_test_cases(self, filepath: str) -> Iterator[TestCase]:
+        """Yield the test cases of a file one at a time, without building a suite."""
+        with open(filepath, 'r') as file:
+            lines = enumerate(file, start=1)
+            input_pins, output_pins = self._read_header(lines)
+            yield from self._iter_test_cases(lines, input_pins, output_pins)
+    
+    def _parse_lines(self, lines: Iterable[str], source_name: str) -> TestSuite:
+        """Parse a header line followed by test case lines."""
+        numbered_lines = enumerate(lines, start=1)
+        input_pins, output_pins = self._read_header(numbered_lines)
+        test_cases = list(self._iter_test_cases(numbered_lines, input_pins, output_pins))
         
         # Figure out chip name from filename
         chip_name = self._extract_chip_name(source_name)
@@ -74,23 +124,42 @@ class TestVectorParser:
             test_cases=test_cases
         )
     
+    def _read_header(self, numbered_lines: Iterator[Tuple[int, str]]) -> Tuple[List[str], List[str]]:
+        """Parse the first non-empty line, which is the header: "a,b;out"."""
+        for _, line in numbered_lines:
+            header = line.strip()
+            if header:
+                return self._parse_header(header)
+        raise ValueError("Empty test file")
+    
+    def _iter_test_cases(self, numbered_lines: Iterator[Tuple[int, str]], input_pins: List[str],
+                         output_pins: List[str]) -> Iterator[TestCase]:
+        """Parse the test case lines that follow the header."""
+        for line_number, line in numbered_lines:
+            line = line.strip()
+            if line:  # Skip empty lines
+                yield self._parse_test_case(line, input_pins, output_pins, line_number)
+    
     def _parse_header(self, header: str) -> Tuple[List[str], List[str]]:
         """
         Parse header line like "a,b;out" or "in,sel;a,b".
         Returns (input_pins, output_pins).
         """
-        if ';' not in header:
+        inputs_part, separator, outputs_part = header.partition(';')
+        if not separator:
             raise ValueError(f"Invalid header format: {header}. Expected 'inputs;outputs'")
         
-        inputs_part, outputs_part = header.split(';', 1)
+        # Pin names are interned, like the HDL tokenizer's identifiers, so the
+        # simulator's dict lookups on them compare by identity
+        intern = sys.intern
         
         # Parse input pins
-        input_pins = [pin.strip() for pin in inputs_part.split(',') if pin.strip()]
+        input_pins = [intern(pin.strip()) for pin in inputs_part.split(',') if pin.strip()]
         if not input_pins:
             raise ValueError("No input pins found in header")
         
         # Parse output pins
-        output_pins = [pin.strip() for pin in outputs_part.split(',') if pin.strip()]
+        output_pins = [intern(pin.strip()) for pin in outputs_part.split(',') if pin.strip()]
         if not output_pins:
             raise ValueError("No output pins found in header")
         
@@ -99,39 +168,36 @@ class TestVectorParser:
     def _parse_test_case(self, line: str, input_pins: List[str], 
                         output_pins: List[str], line_number: int) -> TestCase:
         """Parse one test case line like "0,1;1"."""
-        if ';' not in line:
+        inputs_part, separator, outputs_part = line.partition(';')
+        if not separator:
             raise ValueError(f"Line {line_number}: Expected ';' to separate inputs from outputs")
         
-        inputs_part, outputs_part = line.split(';', 1)
-        
         # Parse input values
-        input_values = [val.strip() for val in inputs_part.split(',')]
+        input_values = inputs_part.split(',')
         if len(input_values) != len(input_pins):
             raise ValueError(f"Line {line_number}: Expected {len(input_pins)} input values, got {len(input_values)}")
         
         # Parse output values
-        output_values = [val.strip() for val in outputs_part.split(',')]
+        output_values = outputs_part.split(',')
         if len(output_values) != len(output_pins):
             raise ValueError(f"Line {line_number}: Expected {len(output_pins)} output values, got {len(output_values)}")
         
-        # Convert to integers and build dictionaries
+        # Plain bits are looked up, which is much cheaper than int(); anything
+        # else (spaces, wider numbers) goes through int()
         try:
-            inputs = {}
-            for i, pin_name in enumerate(input_pins):
-                inputs[pin_name] = int(input_values[i])
-            
-            expected_outputs = {}
-            for i, pin_name in enumerate(output_pins):
-                expected_outputs[pin_name] = int(output_values[i])
-                
-        except ValueError as e:
-            raise ValueError(f"Line {line_number}: Invalid number format: {e}")
-        
-        return TestCase(inputs=inputs, expected_outputs=expected_outputs)
+            inputs = tuple(map(_bit_value, input_values))
+            expected_outputs = tuple(map(_bit_value, output_values))
+        except KeyError:
+            try:
+                inputs = tuple(map(int, input_values))
+                expected_outputs = tuple(map(int, output_values))
+            except ValueError as e:
+                raise ValueError(f"Line {line_number}: Invalid number format: {e}")
+        
+        return TestCase._from_values(inputs, expected_outputs, input_pins, output_pins)
     
     def _extract_chip_name(self, source_name: str) -> str:
         """Get chip name from file path like 'examples/And.tst' -> 'And'."""
-        import os
         base_name = os.path.basename(source_name)
         # Remove .tst extension
         if base_name.endswith('.tst'):
@@ -146,10 +212,12 @@ class ChipTester:
         self.simulator = ChipSimulator(base_directory)
         self.parser = TestVectorParser()
     
-    def run_test_file(self, test_filepath: str, 
-                     verbose: bool = True) -> Tuple[List[TestResult], Dict[str, int]]:
+    def run_test_file(self, test_filepath: str, verbose: bool = True,
+                      trace: bool = True) -> Tuple[List[TestResult], Dict[str, int]]:
         """
         Run all tests from a file and return results.
+        verbose prints the chip's report; with trace off the report only
+        lists the failing test cases, so a green run formats no test lines.
         """
         # Parse the test file
         test_suite = self.parser.parse_file(test_filepath)
@@ -158,19 +226,17 @@ class ChipTester:
             print(f"\nTesting chip: {test_suite.chip_name}")
             print("-" * 50)
         
-        # Run each test case
-        test_results = []
-        passed_count = 0
+        # Run all test cases, then report each one
+        test_results = self._run_suite(test_suite)
+        passed_count = sum(1 for result in test_results if result.passed)
         
-        for i, test_case in enumerate(test_suite.test_cases, start=1):
-            result = self._run_single_test(test_suite.chip_name, test_case, i)
-            test_results.append(result)
-            
-            if result.passed:
-                passed_count += 1
-            
-            if verbose:
-                self._print_test_result(result, i)
+        if verbose:
+            # One write for the whole table rather than a print per test case
+            lines = [self._format_test_result(result, i)
+                     for i, result in enumerate(test_results, start=1)
+                     if trace or not result.passed]
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
         
         # Print summary
         total_tests = len(test_suite.test_cases)
@@ -195,34 +261,76 @@ class ChipTester:
         
         return test_results, summary_stats
     
+    def _run_suite(self, test_suite: TestSuite) -> List[TestResult]:
+        """
+        Run every test case of a suite.
+        All cases go through the chip in one packed pass when the values are
+        plain bits; otherwise (or if the chip fails to load) they run one at
+        a time so errors are still reported per test.
+        """
+        try:
+            instance = self.simulator.compile(test_suite.chip_name)
+        except Exception:
+            instance = None
+        
+        if instance is None or not self._can_pack(test_suite):
+            return [self._run_single_test(test_suite.chip_name, test_case, i)
+                    for i, test_case in enumerate(test_suite.test_cases, start=1)]
+        
+        test_cases = test_suite.test_cases
+        width = len(test_cases)
+        input_columns = zip(*[test_case.input_values for test_case in test_cases])
+        input_planes = {pin: pack_bits(column)
+                        for pin, column in zip(test_suite.input_pins, input_columns)}
+        output_planes = instance.simulate_packed(input_planes, width)
+        
+        # Bit k is set when test case k gets a wrong (or missing) output
+        failed_mask = 0
+        expected_columns = zip(*[test_case.output_values for test_case in test_cases])
+        for pin, column in zip(test_suite.output_pins, expected_columns):
+            expected_plane = pack_bits(column)
+            actual_plane = output_planes.get(pin)
+            if actual_plane is None:
+                failed_mask = (1 << width) - 1
+            else:
+                failed_mask |= actual_plane ^ expected_plane
+        
+        # Unpack each plane into a column once instead of shifting every plane
+        # for every test case, which is quadratic in the number of cases
+        actual_pins = list(output_planes)
+        actual_rows = (zip(*(unpack_bits(output_planes[pin], width) for pin in actual_pins))
+                       if actual_pins else repeat((), width))
+        failed_flags = unpack_bits(failed_mask, width)
+        
+        results = []
+        for test_case, row, failed in zip(test_cases, actual_rows, failed_flags):
+            actual_outputs = dict(zip(actual_pins, row))
+            if failed:
+                results.append(self._check_outputs(test_case, actual_outputs))
+            else:
+                results.append(TestResult(test_case=test_case, actual_outputs=actual_outputs,
+                                          passed=True, message="PASS"))
+        return results
+    
+    @staticmethod
+    def _can_pack(test_suite: TestSuite) -> bool:
+        """Check that every case follows the suite's pin order and holds only bits."""
+        input_pins, output_pins = test_suite.input_pins, test_suite.output_pins
+        values = set()
+        for test_case in test_suite.test_cases:
+            if test_case.input_pins != input_pins or test_case.output_pins != output_pins:
+                return False
+            values.update(test_case.input_values)
+            values.update(test_case.output_values)
+        return values <= {0, 1}
+    
     def _run_single_test(self, chip_name: str, test_case: TestCase, 
                         test_number: int) -> TestResult:
         """Run one test case and return the result."""
         try:
             # Run the simulation
             actual_outputs = self.simulator.simulate_chip(chip_name, test_case.inputs)
-            
-            # Check if outputs match what we expected
-            passed = True
-            failed_pins = []
-            
-            for pin, expected_value in test_case.expected_outputs.items():
-                actual_value = actual_outputs.get(pin)
-                if actual_value != expected_value:
-                    passed = False
-                    failed_pins.append(f"{pin}: expected {expected_value}, got {actual_value}")
-            
-            if passed:
-                message = "PASS"
-            else:
-                message = f"FAIL - {', '.join(failed_pins)}"
-            
-            return TestResult(
-                test_case=test_case,
-                actual_outputs=actual_outputs,
-                passed=passed,
-                message=message
-            )
+            return self._check_outputs(test_case, actual_outputs)
             
         except Exception as e:
             return TestResult(
@@ -232,38 +340,92 @@ class ChipTester:
                 message=f"ERROR - {str(e)}"
             )
     
-    def _print_test_result(self, result: TestResult, test_number: int):
-        """Print the result of one test case."""
+    def _check_outputs(self, test_case: TestCase,
+                       actual_outputs: Dict[str, int]) -> TestResult:
+        """Compare actual outputs against what a test case expects."""
+        passed = True
+        failed_pins = []
+        
+        for pin, expected_value in zip(test_case.output_pins, test_case.output_values):
+            actual_value = actual_outputs.get(pin)
+            if actual_value != expected_value:
+                passed = False
+                failed_pins.append(f"{pin}: expected {expected_value}, got {actual_value}")
+        
+        if passed:
+            message = "PASS"
+        else:
+            message = f"FAIL - {', '.join(failed_pins)}"
+        
+        return TestResult(
+            test_case=test_case,
+            actual_outputs=actual_outputs,
+            passed=passed,
+            message=message
+        )
+    
+    def _iter_file_stats(self, test_files: List[Tuple[str, str]], verbose: bool,
+                         jobs: int, trace: bool = True):
+        """Yield the summary stats of each test file, printing reports in order."""
+        if jobs <= 1 or len(test_files) <= 1:
+            for _, test_file in test_files:
+                yield self.run_test_file(test_file, verbose, trace)[1]
+            return
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        count = len(test_files)
+        with ProcessPoolExecutor(max_workers=min(jobs, count)) as pool:
+            reports = pool.map(_run_test_file_captured,
+                               [self.simulator.base_directory] * count,
+                               [test_file for _, test_file in test_files],
+                               [verbose] * count,
+                               [trace] * count)
+            for stats, output in reports:
+                print(output, end='')
+                yield stats
+    
+    def _format_test_result(self, result: TestResult, test_number: int) -> str:
+        """Format the report line for one test case."""
+        test_case = result.test_case
+        
         # Format input values
-        inputs_str = ", ".join(f"{pin}={val}" for pin, val in result.test_case.inputs.items())
+        inputs_str = ", ".join(f"{pin}={val}" for pin, val in zip(test_case.input_pins, test_case.input_values))
         
         # Format expected outputs
-        expected_str = ", ".join(f"{pin}={val}" for pin, val in result.test_case.expected_outputs.items())
+        expected_str = ", ".join(f"{pin}={val}" for pin, val in zip(test_case.output_pins, test_case.output_values))
         
         # Format actual outputs
         actual_str = ", ".join(f"{pin}={val}" for pin, val in result.actual_outputs.items())
         
-        # Print with pass/fail indicator
+        # Add pass/fail indicator
         status_symbol = "✓" if result.passed else "✗"
-        print(f"Test case {test_number}: {inputs_str} → Expected: {expected_str}, Got: {actual_str} {status_symbol} {result.message}")
+        return f"Test case {test_number}: {inputs_str} → Expected: {expected_str}, Got: {actual_str} {status_symbol} {result.message}"
+    
+    def iter_multiple_tests(self, test_files: List[Tuple[str, str]],
+                            verbose: bool = True, jobs: int = 1, trace: bool = True):
+        """
+        Run tests for multiple chips, yielding (chip_name, stats) as each
+        chip finishes so callers can keep running totals.
+        """
+        # Chip names come from the HDL file names
+        chip_names = [os.path.basename(hdl_file).replace('.hdl', '') for hdl_file, _ in test_files]
+        file_stats = self._iter_file_stats(test_files, verbose, jobs, trace)
+        yield from zip(chip_names, file_stats)
     
     def run_multiple_tests(self, test_files: List[Tuple[str, str]], 
-                          verbose: bool = True) -> Dict[str, Dict[str, int]]:
+                          verbose: bool = True, jobs: int = 1,
+                          trace: bool = True) -> Dict[str, Dict[str, int]]:
         """
         Run tests for multiple chips.
-        test_files is list of (hdl_file, test_file) pairs.
+        test_files is list of (hdl_file, test_file) pairs. With jobs > 1 the
+        files are spread over that many worker processes.
         """
         all_results = {}
         total_passed = 0
         total_tests = 0
         
-        for hdl_file, test_file in test_files:
-            # Extract chip name from HDL file
-            import os
-            chip_name = os.path.basename(hdl_file).replace('.hdl', '')
-            
-            # Run tests for this chip
-            results, stats = self.run_test_file(test_file, verbose)
+        for chip_name, stats in self.iter_multiple_tests(test_files, verbose, jobs, trace):
             all_results[chip_name] = stats
             
             total_passed += stats['passed']
@@ -271,16 +433,30 @@ class ChipTester:
         
         # Print overall summary if multiple chips
         if len(test_files) > 1 and verbose:
-            print("\n" + "=" * 60)
-            print("OVERALL SUMMARY")
-            print("=" * 60)
-            
-            for chip_name, stats in all_results.items():
-                pass_rate = stats['pass_rate']
-                print(f"{chip_name:<15} : {stats['passed']}/{stats['total']} passed ({pass_rate:.1f}%)")
-            
-            print("-" * 60)
-            overall_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
-            print(f"{'TOTAL':<15} : {total_passed}/{total_tests} passed ({overall_rate:.1f}%)")
+            self.print_overall_summary(all_results, total_passed, total_tests)
+        
+        return all_results
+    
+    def print_overall_summary(self, all_results: Dict[str, Dict[str, int]],
+                              total_passed: int, total_tests: int):
+        """Print the per-chip table and totals after running several chips."""
+        print("\n" + "=" * 60)
+        print("OVERALL SUMMARY")
+        print("=" * 60)
+        
+        for chip_name, stats in all_results.items():
+            pass_rate = stats['pass_rate']
+            print(f"{chip_name:<15} : {stats['passed']}/{stats['total']} passed ({pass_rate:.1f}%)")
         
-        return all_results 
\ No newline at end of file
+        print("-" * 60)
+        overall_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
+        print(f"{'TOTAL':<15} : {total_passed}/{total_tests} passed ({overall_rate:.1f}%)")
+
+
+def _run_test_file_captured(base_directory: str, test_file: str,
+                            verbose: bool, trace: bool = True) -> Tuple[Dict[str, int], str]:
+    """Run one test file in a worker process, returning its stats and output."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        _, stats = ChipTester(base_directory).run_test_file(test_file, verbose, trace)
+    return stats, output.getvalue()
@@ -9,28 +9,53 @@ Author: HDL Parser Framework
 Course: Nand2Tetris 2025 Spring
 """
 
-import sys
+import io
 import os
+import pickle
+import tempfile
 import unittest
-from unittest.mock import patch, mock_open
-
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from contextlib import redirect_stdout
+from unittest.mock import patch
 
 from src.hdl_parser import HDLParser, ChipDefinition, PartInstance
-from src.chip_simulator import BuiltInGates, ChipSimulator
+from src.chip_simulator import BuiltInGates, ChipSimulator, ChipInstance
 from src.tester import TestVectorParser, ChipTester
 
+# Example chips shipped with the project, used by the simulator tests
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+# Both-input combinations in truth table order
+_PAIRS = ((0, 0), (0, 1), (1, 0), (1, 1))
+
+# HDL sources shared by the parser tests
+_AND_HDL = """
+CHIP And {
+    IN a, b;
+    OUT out;
+    
+    PARTS:
+    Nand(a=a, b=b, out=nandOut);
+    Not(in=nandOut, out=out);
+}
+"""
+
+_NOT_HDL = """
+CHIP Not {
+    IN in;
+    OUT out;
+    
+    PARTS:
+    Nand(a=in, b=in, out=out);
+}
+"""
+
 
 class TestBuiltInGates(unittest.TestCase):
     """Test built-in gate implementations."""
     
     def test_nand_gate(self):
         """Test NAND gate truth table."""
-        self.assertEqual(BuiltInGates.nand(0, 0), 1)
-        self.assertEqual(BuiltInGates.nand(0, 1), 1)
-        self.assertEqual(BuiltInGates.nand(1, 0), 1)
-        self.assertEqual(BuiltInGates.nand(1, 1), 0)
+        self.assertEqual(tuple(BuiltInGates.nand(a, b) for a, b in _PAIRS), (1, 1, 1, 0))
     
     def test_not_gate(self):
         """Test NOT gate truth table."""
@@ -39,43 +64,28 @@ class TestBuiltInGates(unittest.TestCase):
     
     def test_and_gate(self):
         """Test AND gate truth table."""
-        self.assertEqual(BuiltInGates.and_gate(0, 0), 0)
-        self.assertEqual(BuiltInGates.and_gate(0, 1), 0)
-        self.assertEqual(BuiltInGates.and_gate(1, 0), 0)
-        self.assertEqual(BuiltInGates.and_gate(1, 1), 1)
+        self.assertEqual(tuple(BuiltInGates.and_gate(a, b) for a, b in _PAIRS), (0, 0, 0, 1))
     
     def test_or_gate(self):
         """Test OR gate truth table."""
-        self.assertEqual(BuiltInGates.or_gate(0, 0), 0)
-        self.assertEqual(BuiltInGates.or_gate(0, 1), 1)
-        self.assertEqual(BuiltInGates.or_gate(1, 0), 1)
-        self.assertEqual(BuiltInGates.or_gate(1, 1), 1)
+        self.assertEqual(tuple(BuiltInGates.or_gate(a, b) for a, b in _PAIRS), (0, 1, 1, 1))
 
 
 class TestHDLParser(unittest.TestCase):
     """Test HDL parser functionality."""
     
-    def setUp(self):
-        self.parser = HDLParser()
+    @classmethod
+    def setUpClass(cls):
+        # Parsers reset their state on every parse, so one per class is enough
+        cls.parser = HDLParser()
     
     def test_parse_simple_chip(self):
         """Test parsing a simple chip definition."""
-        hdl_text = """
-        CHIP And {
-            IN a, b;
-            OUT out;
-            
-            PARTS:
-            Nand(a=a, b=b, out=nandOut);
-            Not(in=nandOut, out=out);
-        }
-        """
-        
-        chip_def = self.parser.parse_text(hdl_text)
+        chip_def = self.parser.parse_text(_AND_HDL)
         
         self.assertEqual(chip_def.name, "And")
-        self.assertEqual(chip_def.inputs, ["a", "b"])
-        self.assertEqual(chip_def.outputs, ["out"])
+        self.assertEqual(chip_def.inputs, ("a", "b"))
+        self.assertEqual(chip_def.outputs, ("out",))
         self.assertEqual(len(chip_def.parts), 2)
         
         # Check first part (Nand)
@@ -107,31 +117,93 @@ class TestHDLParser(unittest.TestCase):
         
         self.assertEqual(tokens, expected_tokens)
     
+    def test_tokenizer_comments_and_keyword_prefixes(self):
+        """Test comments are dropped and keyword-like names stay identifiers."""
+        text = "// header\nOUT INPUT, CHIPS; // trailing\nPARTS:"
+        tokens = self.parser.tokenizer.tokenize(text)
+        
+        self.assertEqual(tokens, [
+            ("OUT", "OUT"),
+            ("IDENTIFIER", "INPUT"),
+            ("COMMA", ","),
+            ("IDENTIFIER", "CHIPS"),
+            ("SEMICOLON", ";"),
+            ("PARTS", "PARTS"),
+            ("COLON", ":"),
+        ])
+    
     def test_parse_single_input_output(self):
         """Test parsing chip with single input and output."""
+        chip_def = self.parser.parse_text(_NOT_HDL)
+        
+        self.assertEqual(chip_def.name, "Not")
+        self.assertEqual(chip_def.inputs, ("in",))
+        self.assertEqual(chip_def.outputs, ("out",))
+        self.assertEqual(len(chip_def.parts), 1)
+    
+    def test_parse_text_reuses_definition(self):
+        """Test that parsing the same text twice returns the shared definition."""
+        chip_def = self.parser.parse_text(_AND_HDL)
+        
+        self.assertIs(self.parser.parse_text(_AND_HDL), chip_def)
+        self.assertIsNot(self.parser.parse_text(_NOT_HDL), chip_def)
+        with self.assertRaises(AttributeError):
+            chip_def.name = "Or"
+        with self.assertRaises(AttributeError):
+            chip_def.parts[0].chip_type = "And"
+    
+    @patch('src.hdl_parser.TEXT_CACHE_SIZE', 1)
+    def test_text_cache_is_bounded(self):
+        """Test that the parser only remembers recently parsed texts."""
+        parser = HDLParser()
+        chip_def = parser.parse_text(_AND_HDL)
+        parser.parse_text(_NOT_HDL)
+        
+        self.assertEqual(len(parser._text_cache), 1)
+        self.assertIsNot(parser.parse_text(_AND_HDL), chip_def)
+    
+    def test_identical_connections_are_shared(self):
+        """Test that parts wired the same way share one connections dict."""
         hdl_text = """
-        CHIP Not {
-            IN in;
+        CHIP Twice {
+            IN a, b;
             OUT out;
             
             PARTS:
-            Nand(a=in, b=in, out=out);
+            Nand(a=a, b=b, out=x);
+            Nand(a=a, b=b, out=x);
+            Nand(b=b, a=a, out=x);
         }
         """
         
-        chip_def = self.parser.parse_text(hdl_text)
+        parts = self.parser.parse_text(hdl_text).parts
         
-        self.assertEqual(chip_def.name, "Not")
-        self.assertEqual(chip_def.inputs, ["in"])
-        self.assertEqual(chip_def.outputs, ["out"])
-        self.assertEqual(len(chip_def.parts), 1)
+        self.assertIs(parts[0].connections, parts[1].connections)
+        # Pin order is kept, so a differently ordered part gets its own dict
+        self.assertIsNot(parts[0].connections, parts[2].connections)
+        self.assertEqual(list(parts[2].connections), ["b", "a", "out"])
+    
+    def test_shared_connections_are_read_only(self):
+        """Test that a shared connections mapping can't be changed for other chips."""
+        first = HDLParser().parse_text("CHIP X { IN a, b; OUT out; PARTS: Nand(a=a, b=b, out=out); }")
+        with self.assertRaises(TypeError):
+            first.parts[0].connections['a'] = 'zzz'
+        
+        second = HDLParser().parse_text("CHIP Y { IN a, b; OUT out; PARTS: Nand(a=a, b=b, out=out); }")
+        self.assertEqual(second.parts[0].connections, {"a": "a", "b": "b", "out": "out"})
+        
+        # Pickled parts come back sharing the same read-only mapping
+        restored = pickle.loads(pickle.dumps(second.parts[0]))
+        self.assertEqual(restored, second.parts[0])
+        self.assertIs(restored.connections, second.parts[0].connections)
 
 
 class TestTestVectorParser(unittest.TestCase):
     """Test test vector parser functionality."""
     
-    def setUp(self):
-        self.parser = TestVectorParser()
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = TestVectorParser()
     
     def test_parse_simple_test(self):
         """Test parsing simple test vectors."""
@@ -157,6 +229,15 @@ class TestTestVectorParser(unittest.TestCase):
         test_case = test_suite.test_cases[3]
         self.assertEqual(test_case.inputs, {"a": 1, "b": 1})
         self.assertEqual(test_case.expected_outputs, {"out": 1})
+        
+        # Values are stored as tuples, with the pin lists shared by the suite
+        self.assertEqual(test_case.input_values, (1, 1))
+        self.assertIs(test_case.input_pins, test_suite.input_pins)
+        
+        # The dict constructor still works and builds the same case
+        built = type(test_case)(inputs={"a": 1, "b": 1}, expected_outputs={"out": 1})
+        self.assertEqual(built, test_case)
+        self.assertEqual(repr(built), "TestCase(inputs={'a': 1, 'b': 1}, expected_outputs={'out': 1})")
     
     def test_parse_single_input_output(self):
         """Test parsing test with single input and output."""
@@ -170,6 +251,46 @@ class TestTestVectorParser(unittest.TestCase):
         self.assertEqual(test_suite.output_pins, ["out"])
         self.assertEqual(len(test_suite.test_cases), 2)
     
+    def test_pin_names_match_hdl_identifiers(self):
+        """Test that header pins are the same strings the HDL parser produced."""
+        chip_def = HDLParser().parse_text(_NOT_HDL)
+        test_suite = self.parser.parse_text(" in ; out \n0;1", "Not.tst")
+        
+        self.assertIs(test_suite.input_pins[0], chip_def.inputs[0])
+        self.assertIs(test_suite.output_pins[0], chip_def.outputs[0])
+    
+    def test_parse_spaced_and_wide_values(self):
+        """Test that values with spaces or more than one bit still parse."""
+        test_suite = self.parser.parse_text("a,b;out\n 1, 0 ; 2\n0,1;1", "Add.tst")
+        
+        self.assertEqual([case.input_values for case in test_suite.test_cases], [(1, 0), (0, 1)])
+        self.assertEqual([case.output_values for case in test_suite.test_cases], [(2,), (1,)])
+        
+        with self.assertRaisesRegex(ValueError, "Line 2: Invalid number format"):
+            self.parser.parse_text("a;out\nx;1")
+    
+    def test_parse_file_streams_lines(self):
+        """Test reading a test file line by line, with blank lines around."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "Not.tst")
+            with open(path, "w") as f:
+                f.write("\nin;out\n0;1\n\n1;0\n")
+            
+            test_suite = self.parser.parse_file(path)
+            self.assertEqual(test_suite.chip_name, "Not")
+            self.assertEqual([case.inputs for case in test_suite.test_cases], [{"in": 0}, {"in": 1}])
+            
+            streamed = list(self.parser.iter_test_cases(path))
+            self.assertEqual(streamed, test_suite.test_cases)
+            
+            with open(path, "a") as f:
+                f.write("1\n")
+            with self.assertRaisesRegex(ValueError, "Line 6"):
+                self.parser.parse_file(path)
+        
+        with self.assertRaisesRegex(ValueError, "Empty test file"):
+            self.parser.parse_text("\n\n")
+    
     def test_extract_chip_name(self):
         """Test chip name extraction from file paths."""
         test_cases = [
@@ -187,9 +308,6 @@ class TestTestVectorParser(unittest.TestCase):
 class TestChipSimulator(unittest.TestCase):
     """Test chip simulator functionality."""
     
-    def setUp(self):
-        self.simulator = ChipSimulator()
-    
     def test_built_in_chip_mapping(self):
         """Test that all built-in chips are properly mapped."""
         # Test that simulator can handle all required built-in chips
@@ -228,16 +346,121 @@ class TestChipSimulator(unittest.TestCase):
         )
         mock_parse.return_value = mock_chip_def
         
-        # Use simulate_chip which actually implements caching
+        # Use simulate_chip which actually implements caching, on a fresh
+        # simulator so nothing is cached yet
+        simulator = ChipSimulator()
+        
         # First call should parse the file
-        result1 = self.simulator.simulate_chip("TestChip", {"a": 1})
+        result1 = simulator.simulate_chip("TestChip", {"a": 1})
         self.assertEqual(mock_parse.call_count, 1)
         
         # Second call should use cache
-        result2 = self.simulator.simulate_chip("TestChip", {"a": 0})
+        result2 = simulator.simulate_chip("TestChip", {"a": 0})
         self.assertEqual(mock_parse.call_count, 1)  # Still 1, not 2
         
         # Both calls should work (we can't compare results since they depend on simulation)
+    
+    def test_chip_definitions_shared_across_loads(self):
+        """Test that the same HDL file is only parsed once per process."""
+        from src.chip_simulator import load_chip_definition
+        
+        relative_path = os.path.join(EXAMPLES_DIR, "HalfAdder.hdl")
+        first = load_chip_definition(relative_path)
+        second = load_chip_definition(os.path.abspath(relative_path))
+        
+        self.assertIs(first, second)
+    
+    def test_parse_hdl_file_reads_the_file(self):
+        """Test that parse_hdl_file parses the file itself, not via the simulator cache."""
+        from src.chip_simulator import load_chip_definition
+        from src.hdl_parser import parse_hdl_file
+        
+        hdl_path = os.path.join(EXAMPLES_DIR, "Mux.hdl")
+        with patch('src.chip_simulator.load_chip_definition') as mock_load:
+            chip_def = parse_hdl_file(hdl_path)
+        
+        mock_load.assert_not_called()
+        self.assertEqual(chip_def, load_chip_definition(hdl_path))
+        self.assertEqual(chip_def.name, "Mux")
+    
+    def test_edited_file_is_parsed_again(self):
+        """Test that the shared definition cache notices a changed mtime."""
+        from src.chip_simulator import load_chip_definition
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            hdl_path = os.path.join(temp_dir, "Buffer.hdl")
+            with open(hdl_path, 'w') as hdl_file:
+                hdl_file.write("CHIP Buffer { IN a; OUT out; PARTS: Not(in=a, out=x); Not(in=x, out=out); }")
+            first = load_chip_definition(hdl_path)
+            self.assertIs(load_chip_definition(hdl_path), first)
+            
+            with open(hdl_path, 'w') as hdl_file:
+                hdl_file.write("CHIP Buffer { IN a; OUT out; PARTS: And(a=a, b=a, out=out); }")
+            stat = os.stat(hdl_path)
+            os.utime(hdl_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            
+            second = load_chip_definition(hdl_path)
+        
+        self.assertEqual(len(first.parts), 2)
+        self.assertEqual(len(second.parts), 1)
+    
+    def test_simulator_notices_edited_sub_chip(self):
+        """Test that a simulator drops what it built from a chip once a sub-chip's file changes."""
+        def write_hdl(path: str, text: str, bump_ns: int = 0):
+            with open(path, 'w') as hdl_file:
+                hdl_file.write(text)
+            if bump_ns:
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            inner_path = os.path.join(temp_dir, "Inner.hdl")
+            write_hdl(inner_path, "CHIP Inner { IN a; OUT out; PARTS: Not(in=a, out=out); }")
+            write_hdl(os.path.join(temp_dir, "Outer.hdl"),
+                      "CHIP Outer { IN a; OUT out; PARTS: Inner(a=a, out=out); }")
+            simulator = ChipSimulator(temp_dir)
+            self.assertEqual(simulator.simulate_chip("Outer", {"a": 1}), {"out": 0})
+            first = simulator.compile("Outer")
+            
+            write_hdl(inner_path, "CHIP Inner { IN a; OUT out; PARTS: And(a=a, b=a, out=out); }",
+                      bump_ns=1_000_000_000)
+            
+            self.assertEqual(simulator.simulate_chip("Outer", {"a": 1}), {"out": 1})
+            self.assertIsNot(simulator.compile("Outer"), first)
+            self.assertEqual(simulator.simulate_batch("Outer", {"a": [0, 1]}), {"out": [0, 1]})
+    
+    def test_disk_cache_reused_between_runs(self):
+        """Test that a parsed chip is pickled and loaded back instead of re-parsed."""
+        from src import chip_simulator
+        
+        hdl_path = os.path.abspath(os.path.join(EXAMPLES_DIR, "Xor.hdl"))
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch.dict(os.environ, {chip_simulator.DISK_CACHE_ENV: cache_dir}):
+            first = chip_simulator._parse_with_disk_cache(hdl_path)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            
+            with patch('src.hdl_parser.HDLParser.parse_file') as mock_parse:
+                second = chip_simulator._parse_with_disk_cache(hdl_path)
+                mock_parse.assert_not_called()
+        
+        self.assertEqual(second, first)
+    
+    def test_corrupt_disk_cache_entry_is_parsed_again(self):
+        """Test that an unreadable cache entry falls back to parsing the file."""
+        from src import chip_simulator
+        
+        hdl_path = os.path.abspath(os.path.join(EXAMPLES_DIR, "Xor.hdl"))
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch.dict(os.environ, {chip_simulator.DISK_CACHE_ENV: cache_dir}):
+            first = chip_simulator._parse_with_disk_cache(hdl_path)
+            entry_path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+            self.assertIn(chip_simulator._DISK_CACHE_VERSION, entry_path)
+            # Garbage, a truncated pickle, and a pickle of the wrong type
+            for contents in (b"not a pickle", pickle.dumps(first)[:-5], pickle.dumps(["Xor"])):
+                with self.subTest(contents=contents[:12]):
+                    with open(entry_path, 'wb') as entry:
+                        entry.write(contents)
+                    self.assertEqual(chip_simulator._parse_with_disk_cache(hdl_path), first)
 
 
 class TestIntegration(unittest.TestCase):
@@ -245,9 +468,6 @@ class TestIntegration(unittest.TestCase):
     
     def test_and_gate_simulation(self):
         """Test complete AND gate simulation."""
-        # Create a mock simulator with built-in chips only
-        simulator = ChipSimulator()
-        
         # Test all input combinations for NAND gate
         test_cases = [
             ({"a": 0, "b": 0}, {"out": 1}),
@@ -260,7 +480,173 @@ class TestIntegration(unittest.TestCase):
             # Simulate NAND gate directly
             result = BuiltInGates.nand(inputs["a"], inputs["b"])
             self.assertEqual(result, expected_outputs["out"])
+    
+    def test_full_adder_flattened_netlist(self):
+        """Test that nested chips are inlined into a single gate netlist."""
+        simulator = ChipSimulator(EXAMPLES_DIR)
+        instance = simulator.compile("FullAdder")
+        
+        # Two HalfAdders (5-gate Xor + And each) and one Or
+        self.assertEqual(len(instance.ops), 13)
+        
+        for a in (0, 1):
+            for b in (0, 1):
+                for c in (0, 1):
+                    total = a + b + c
+                    outputs = simulator.simulate_chip("FullAdder", {"a": a, "b": b, "c": c})
+                    self.assertEqual(outputs, {"sum": total & 1, "carry": total >> 1})
+    
+    def test_parts_out_of_order(self):
+        """Test that parts don't need to be listed in data-flow order."""
+        hdl = """
+        CHIP AndOutOfOrder {
+            IN a, b;
+            OUT out;
+            PARTS:
+            Not(in=x, out=out);
+            Nand(a=a, b=b, out=x);
+        }
+        """
+        instance = ChipInstance(HDLParser().parse_text(hdl))
+        
+        for a in (0, 1):
+            for b in (0, 1):
+                instance.reset()
+                instance.set_inputs({"a": a, "b": b})
+                instance.simulate()
+                self.assertEqual(instance.get_outputs(), {"out": a & b})
+    
+    def test_combinational_loop_rejected(self):
+        """Test that a feedback loop between parts is reported."""
+        hdl = """
+        CHIP Loop {
+            IN a;
+            OUT out;
+            PARTS:
+            Nand(a=a, b=y, out=x);
+            Not(in=x, out=y);
+            Not(in=y, out=out);
+        }
+        """
+        with self.assertRaises(ValueError):
+            ChipInstance(HDLParser().parse_text(hdl))
+    
+    def test_lookup_table_matches_netlist(self):
+        """Test that table-backed simulate_chip agrees with running the netlist."""
+        simulator = ChipSimulator(EXAMPLES_DIR)
+        instance = simulator.compile("FullAdder")
+        
+        for a in (0, 1):
+            for b in (0, 1):
+                for c in (0, 1):
+                    inputs = {"a": a, "b": b, "c": c}
+                    outputs = simulator.simulate_chip("FullAdder", inputs)
+                    
+                    instance.reset()
+                    instance.set_inputs(inputs)
+                    instance.simulate()
+                    self.assertEqual(outputs, instance.get_outputs())
+        
+        self.assertIsNotNone(simulator._lut_cache["FullAdder"])
+    
+    def test_exhaustive_simulation(self):
+        """Test that one packed pass produces the whole truth table."""
+        instance = ChipSimulator(EXAMPLES_DIR).compile("FullAdder")
+        
+        outputs = instance.simulate_exhaustive()
+        
+        # Combination k has a = bit 0, b = bit 1, c = bit 2 of k
+        expected_sum = sum(1 << k for k in range(8) if bin(k).count("1") % 2)
+        expected_carry = sum(1 << k for k in range(8) if bin(k).count("1") >= 2)
+        self.assertEqual(outputs, {"sum": expected_sum, "carry": expected_carry})
+    
+    @patch('src.chip_simulator.LUT_MAX_INPUTS', 0)
+    def test_reused_instance_is_reset_between_runs(self):
+        """Test that a cached chip instance doesn't keep signals from the last run."""
+        simulator = ChipSimulator(EXAMPLES_DIR)
+        simulator.simulate_chip("Mux", {"a": 1, "b": 1, "sel": 1})
+        
+        outputs = simulator.simulate_chip("Mux", {"b": 1})
+        
+        fresh_outputs = ChipSimulator(EXAMPLES_DIR).simulate_chip("Mux", {"b": 1})
+        self.assertEqual(outputs, fresh_outputs)
+    
+    @patch('src.chip_simulator.LUT_MAX_INPUTS', 0)
+    def test_repeated_inputs_reuse_outputs(self):
+        """Test that a chip without a lookup table isn't re-run for inputs it has seen."""
+        simulator = ChipSimulator(EXAMPLES_DIR)
+        
+        with patch.object(ChipInstance, "simulate", autospec=True,
+                          side_effect=ChipInstance.simulate) as simulate:
+            first = simulator.simulate_chip("Mux", {"a": 1, "b": 0, "sel": 0})
+            first["out"] = 5  # Callers get their own copy
+            second = simulator.simulate_chip("Mux", {"a": 1, "b": 0, "sel": 0})
+            simulator.simulate_chip("Mux", {"a": 0, "b": 0, "sel": 0})
+        
+        self.assertEqual(second, {"out": 1})
+        self.assertEqual(simulate.call_count, 2)
+    
+    def test_batch_simulation_matches_single_runs(self):
+        """Test that simulating a batch gives the same outputs as one-by-one runs."""
+        simulator = ChipSimulator(EXAMPLES_DIR)
+        rows = [(a, b, sel) for a in (0, 1) for b in (0, 1) for sel in (0, 1)]
+        columns = {
+            "a": [row[0] for row in rows],
+            "b": [row[1] for row in rows],
+            "sel": [row[2] for row in rows],
+        }
+        
+        batch_outputs = simulator.simulate_batch("Mux", columns)
+        
+        expected = [simulator.simulate_chip("Mux", {"a": a, "b": b, "sel": sel})["out"]
+                    for a, b, sel in rows]
+        self.assertEqual(batch_outputs, {"out": expected})
+    
+    
+    def test_tester_packed_suite_reports_failures(self):
+        """Test that a suite run in one packed pass still flags the wrong rows."""
+        tester = ChipTester(EXAMPLES_DIR)
+        suite = tester.parser.parse_text("a,b;out\n0,0;0\n0,1;1\n1,0;1\n1,1;1", "And.tst")
+        
+        results = tester._run_suite(suite)
+        
+        self.assertEqual([result.passed for result in results], [True, False, False, True])
+        self.assertEqual(results[1].actual_outputs, {"out": 0})
+        self.assertEqual(results[1].message, "FAIL - out: expected 1, got 0")
+    
+    
+    def test_tester_failures_only_report(self):
+        """Test that with trace off only the failing test cases are listed."""
+        tester = ChipTester(EXAMPLES_DIR)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_path = os.path.join(temp_dir, "And.tst")
+            with open(test_path, "w") as f:
+                f.write("a,b;out\n0,0;0\n1,1;0\n")
+            
+            output = io.StringIO()
+            with redirect_stdout(output):
+                _, stats = tester.run_test_file(test_path, trace=False)
+        
+        self.assertEqual(stats["failed"], 1)
+        self.assertNotIn("Test case 1:", output.getvalue())
+        self.assertIn("Test case 2: a=1, b=1", output.getvalue())
+    
+    
+    def test_tester_parallel_matches_serial(self):
+        """Test that running chips in worker processes reports the same as serially."""
+        pairs = [(os.path.join(EXAMPLES_DIR, f"{name}.hdl"), os.path.join(EXAMPLES_DIR, f"{name}.tst"))
+                 for name in ("And", "Mux", "FullAdder")]
+        tester = ChipTester(EXAMPLES_DIR)
+        
+        serial_output, parallel_output = io.StringIO(), io.StringIO()
+        with redirect_stdout(serial_output):
+            serial_results = tester.run_multiple_tests(pairs)
+        with redirect_stdout(parallel_output):
+            parallel_results = tester.run_multiple_tests(pairs, jobs=2)
+        
+        self.assertEqual(parallel_results, serial_results)
+        self.assertEqual(parallel_output.getvalue(), serial_output.getvalue())
 
 
 if __name__ == "__main__":
-    unittest.main() 
\ No newline at end of file
+    unittest.main() 
@@ -9,18 +9,17 @@ Author: HDL Parser Framework
 Course: Nand2Tetris 2025 Spring
 """
 
-import sys
-import os
 import unittest
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from src.gates.builtin_gates import (
     GateLogic, NandGateLogic, NotGateLogic, AndGateLogic, OrGateLogic,
     BuiltinGate, GateFactory, GateRegistry, gate_registry,
     get_builtin_gate, is_builtin_gate, get_all_builtin_gates, BuiltInGates
 )
+from src.bits import pack_bits, unpack_bits
+
+# Both-input combinations in truth table order
+_PAIRS = ((0, 0), (0, 1), (1, 0), (1, 1))
 
 
 class TestGateLogic(unittest.TestCase):
@@ -31,16 +30,15 @@ class TestGateLogic(unittest.TestCase):
         logic = NandGateLogic()
         
         # Test all combinations
-        self.assertEqual(logic.compute({'a': 0, 'b': 0}), {'out': 1})
-        self.assertEqual(logic.compute({'a': 0, 'b': 1}), {'out': 1})
-        self.assertEqual(logic.compute({'a': 1, 'b': 0}), {'out': 1})
-        self.assertEqual(logic.compute({'a': 1, 'b': 1}), {'out': 0})
+        self.assertEqual(tuple(logic.compute({'a': a, 'b': b}) for a, b in _PAIRS),
+                         ({'out': 1}, {'out': 1}, {'out': 1}, {'out': 0}))
         
         # Test truth table
         truth_table = logic.get_truth_table()
         self.assertEqual(len(truth_table), 4)
         self.assertIn({'a': 0, 'b': 0, 'out': 1}, truth_table)
         self.assertIn({'a': 1, 'b': 1, 'out': 0}, truth_table)
+        self.assertIs(NandGateLogic().get_truth_table(), truth_table)
     
     def test_not_gate_logic(self):
         """Test NOT gate logic implementation."""
@@ -61,10 +59,8 @@ class TestGateLogic(unittest.TestCase):
         logic = AndGateLogic()
         
         # Test all combinations
-        self.assertEqual(logic.compute({'a': 0, 'b': 0}), {'out': 0})
-        self.assertEqual(logic.compute({'a': 0, 'b': 1}), {'out': 0})
-        self.assertEqual(logic.compute({'a': 1, 'b': 0}), {'out': 0})
-        self.assertEqual(logic.compute({'a': 1, 'b': 1}), {'out': 1})
+        self.assertEqual(tuple(logic.compute({'a': a, 'b': b}) for a, b in _PAIRS),
+                         ({'out': 0}, {'out': 0}, {'out': 0}, {'out': 1}))
         
         # Test truth table
         truth_table = logic.get_truth_table()
@@ -77,16 +73,40 @@ class TestGateLogic(unittest.TestCase):
         logic = OrGateLogic()
         
         # Test all combinations
-        self.assertEqual(logic.compute({'a': 0, 'b': 0}), {'out': 0})
-        self.assertEqual(logic.compute({'a': 0, 'b': 1}), {'out': 1})
-        self.assertEqual(logic.compute({'a': 1, 'b': 0}), {'out': 1})
-        self.assertEqual(logic.compute({'a': 1, 'b': 1}), {'out': 1})
+        self.assertEqual(tuple(logic.compute({'a': a, 'b': b}) for a, b in _PAIRS),
+                         ({'out': 0}, {'out': 1}, {'out': 1}, {'out': 1}))
         
         # Test truth table
         truth_table = logic.get_truth_table()
         self.assertEqual(len(truth_table), 4)
         self.assertIn({'a': 0, 'b': 0, 'out': 0}, truth_table)
         self.assertIn({'a': 1, 'b': 0, 'out': 1}, truth_table)
+    
+    def test_truth_table_words(self):
+        """Test the packed truth table words match the listed truth tables."""
+        for logic in (NandGateLogic(), NotGateLogic(), AndGateLogic(), OrGateLogic()):
+            with self.subTest(logic=type(logic).__name__):
+                for row in logic.get_truth_table():
+                    index = 0
+                    for pin, value in row.items():
+                        if pin != 'out':
+                            index = (index << 1) | value
+                    self.assertEqual((logic._tt_word >> index) & 1, row['out'])
+    
+    def test_shared_outputs_are_read_only(self):
+        """Test that callers can't change the outputs every gate shares."""
+        with self.assertRaises(TypeError):
+            NandGateLogic().compute({'a': 1, 'b': 1})['out'] = 1
+        with self.assertRaises(TypeError):
+            NotGateLogic().get_truth_table()[0]['out'] = 0
+        self.assertEqual(NotGateLogic().compute({'in': 1}), {'out': 0})
+    
+    def test_compute_rejects_non_bits(self):
+        """Test that compute() reports values other than 0 and 1 clearly."""
+        for logic, inputs in ((NandGateLogic(), {'a': 2, 'b': 1}), (AndGateLogic(), {'a': -1, 'b': 0}),
+                              (OrGateLogic(), {'a': [1], 'b': 0}), (NotGateLogic(), {'in': 3})):
+            with self.subTest(logic=type(logic).__name__), self.assertRaises(ValueError):
+                logic.compute(inputs)
 
 
 class TestBuiltinGate(unittest.TestCase):
@@ -100,11 +120,24 @@ class TestBuiltinGate(unittest.TestCase):
         self.assertEqual(gate.name, "Nand")
         self.assertEqual(gate.get_input_pins(), ["a", "b"])
         self.assertEqual(gate.get_output_pins(), ["out"])
+        self.assertIs(gate.get_input_pins(), gate.get_input_pins())
         
         # Test evaluation
         result = gate.evaluate({"a": 1, "b": 1})
         self.assertEqual(result, {"out": 0})
     
+    def test_swapping_logic(self):
+        """Test that assigning new logic changes what the gate computes."""
+        gate = BuiltinGate("And", ["a", "b"], ["out"], AndGateLogic())
+        self.assertTrue(gate.test_all_combinations())
+        
+        gate.logic = OrGateLogic()
+        
+        self.assertEqual([gate.evaluate({"a": a, "b": b})["out"] for a, b in _PAIRS], [0, 1, 1, 1])
+        self.assertEqual(gate.evaluate_packed({"a": 0b1100, "b": 0b1010}, 4), {"out": 0b1110})
+        self.assertTrue(gate.test_all_combinations())
+    
+    @unittest.skipUnless(__debug__, "input validation is skipped under python -O")
     def test_gate_validation(self):
         """Test gate input/output validation."""
         logic = NandGateLogic()
@@ -118,6 +151,45 @@ class TestBuiltinGate(unittest.TestCase):
         with self.assertRaises(ValueError):
             gate.evaluate({"a": 2, "b": 1})  # Invalid value '2'
     
+    def test_evaluate_checks_outputs(self):
+        """Test that evaluate() reports logic that leaves out an output."""
+        class NoOutput(GateLogic):
+            def compute(self, inputs):
+                return {}
+            
+            def get_truth_table(self):
+                return [{"a": 0, "out": 0}]
+        
+        silent_gate = BuiltinGate("Silent", ["a"], ["out"], NoOutput())
+        with self.assertRaises(ValueError):
+            silent_gate.evaluate({"a": 0})
+        self.assertFalse(silent_gate.test_all_combinations())
+    
+    def test_evaluate_packed(self):
+        """Test evaluating input vectors packed one bit per vector."""
+        packed = {"a": 0b1100, "b": 0b1010}
+        self.assertEqual(GateFactory.create_gate("Nand").evaluate_packed(packed, 4), {"out": 0b0111})
+        self.assertEqual(GateFactory.create_gate("And").evaluate_packed(packed, 4), {"out": 0b1000})
+        self.assertEqual(GateFactory.create_gate("Or").evaluate_packed(packed, 4), {"out": 0b1110})
+        self.assertEqual(GateFactory.create_gate("Not").evaluate_packed({"in": 0b1100}, 4), {"out": 0b0011})
+        
+        # Custom logic is run per vector and repacked
+        class Xor(GateLogic):
+            def compute(self, inputs):
+                return {"out": inputs["a"] ^ inputs["b"]}
+            
+            def get_truth_table(self):
+                return []
+        
+        xor_gate = BuiltinGate("Xor", ["a", "b"], ["out"], Xor())
+        self.assertEqual(xor_gate.evaluate_packed(packed, 4), {"out": 0b0110})
+        
+        # Bit columns go in and out through pack_bits/unpack_bits
+        columns = {"a": pack_bits([0, 0, 1, 1, 1]), "b": pack_bits([0, 1, 0, 1, 1])}
+        outputs = GateFactory.create_gate("Nand").evaluate_packed(columns, 5)
+        self.assertEqual(unpack_bits(outputs["out"], 5), [1, 1, 1, 0, 0])
+        self.assertEqual(GateFactory.create_gate("Not").evaluate_packed({"in": 0}, 0), {"out": 0})
+    
     def test_truth_table_testing(self):
         """Test automatic truth table validation."""
         logic = NandGateLogic()
@@ -163,6 +235,16 @@ class TestGateFactory(unittest.TestCase):
         or_gate = GateFactory.create_gate("Or")
         self.assertEqual(or_gate.name, "Or")
     
+    def test_create_gate_returns_fresh_gates(self):
+        """Test the factory hands every caller a gate of its own."""
+        gate = GateFactory.create_gate("And")
+        self.assertIsNot(gate, GateFactory.create_gate("And"))
+        self.assertIsNot(GateFactory.create_gate("Not"), get_builtin_gate("Not"))
+        
+        gate.logic = OrGateLogic()
+        self.assertEqual(get_builtin_gate("And").evaluate({"a": 0, "b": 1}), {"out": 0})
+        self.assertEqual(GateFactory.create_gate("And").evaluate({"a": 0, "b": 1}), {"out": 0})
+
     def test_create_unknown_gate(self):
         """Test creating unknown gate throws error."""
         with self.assertRaises(ValueError):
@@ -208,6 +290,11 @@ class TestGateRegistry(unittest.TestCase):
         
         all_gates = registry.get_all_gates()
         self.assertEqual(len(all_gates), 4)
+        
+        # The view is read-only and not copied per call
+        with self.assertRaises(TypeError):
+            all_gates["Xor"] = all_gates["Nand"]
+        self.assertIs(registry.get_all_gates(), all_gates)
     
     def test_get_gate(self):
         """Test getting gates from registry."""
@@ -254,26 +341,17 @@ class TestLegacyCompatibility(unittest.TestCase):
     def test_legacy_builtin_gates_class(self):
         """Test legacy BuiltInGates class still works."""
         # Test NAND
-        self.assertEqual(BuiltInGates.nand(0, 0), 1)
-        self.assertEqual(BuiltInGates.nand(0, 1), 1)
-        self.assertEqual(BuiltInGates.nand(1, 0), 1)
-        self.assertEqual(BuiltInGates.nand(1, 1), 0)
+        self.assertEqual(tuple(BuiltInGates.nand(a, b) for a, b in _PAIRS), (1, 1, 1, 0))
         
         # Test NOT
         self.assertEqual(BuiltInGates.not_gate(0), 1)
         self.assertEqual(BuiltInGates.not_gate(1), 0)
         
         # Test AND
-        self.assertEqual(BuiltInGates.and_gate(0, 0), 0)
-        self.assertEqual(BuiltInGates.and_gate(0, 1), 0)
-        self.assertEqual(BuiltInGates.and_gate(1, 0), 0)
-        self.assertEqual(BuiltInGates.and_gate(1, 1), 1)
+        self.assertEqual(tuple(BuiltInGates.and_gate(a, b) for a, b in _PAIRS), (0, 0, 0, 1))
         
         # Test OR
-        self.assertEqual(BuiltInGates.or_gate(0, 0), 0)
-        self.assertEqual(BuiltInGates.or_gate(0, 1), 1)
-        self.assertEqual(BuiltInGates.or_gate(1, 0), 1)
-        self.assertEqual(BuiltInGates.or_gate(1, 1), 1)
+        self.assertEqual(tuple(BuiltInGates.or_gate(a, b) for a, b in _PAIRS), (0, 1, 1, 1))
 
 
 class TestGateIntegration(unittest.TestCase):
@@ -294,18 +372,15 @@ class TestGateIntegration(unittest.TestCase):
         not_gate = get_builtin_gate("Not")
         and_gate = get_builtin_gate("And")
         
-        # Test all input combinations
-        for a in [0, 1]:
-            for b in [0, 1]:
-                # Compute AND using NAND + NOT
-                nand_result = nand_gate.evaluate({"a": a, "b": b})
-                composed_result = not_gate.evaluate({"in": nand_result["out"]})
-                
-                # Compare with direct AND
-                direct_result = and_gate.evaluate({"a": a, "b": b})
-                
-                self.assertEqual(composed_result["out"], direct_result["out"],
-                               f"Composition failed for inputs a={a}, b={b}")
+        # Compute AND using NAND + NOT over all input combinations
+        nand_outs = tuple(nand_gate.evaluate({"a": a, "b": b})["out"] for a, b in _PAIRS)
+        composed = tuple(not_gate.evaluate({"in": value})["out"] for value in nand_outs)
+        
+        # Compare with direct AND, row by row in _PAIRS order
+        direct = tuple(and_gate.evaluate({"a": a, "b": b})["out"] for a, b in _PAIRS)
+        
+        self.assertEqual(composed, direct)
+        self.assertEqual(direct, (0, 0, 0, 1))
 
 
 if __name__ == "__main__":
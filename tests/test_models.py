@@ -9,25 +9,33 @@ Author: HDL Parser Framework
 Course: Nand2Tetris 2025 Spring
 """
 
-import sys
-import os
 import unittest
+from dataclasses import asdict, fields, replace
 from datetime import datetime
+from itertools import product
 from unittest.mock import patch
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from src.models.chip_models import (
     ChipDefinition, PartInstance, Pin, Connection, SimulationState,
     ChipType, PinType, create_builtin_chip_definition, create_custom_chip_definition
 )
 from src.models.test_models import (
     TestVector, TestResult, TestSuite, TestReport, TestStatus, TestFormat,
-    create_test_vector, create_test_suite
+    BitPackedTestVector, create_test_vector, create_test_suite
 )
 
 
+def _truth_table_vectors(pins, compute):
+    """Build test1, test2, ... vectors for every input combination, in truth table order."""
+    return tuple(TestVector(f"test{i}", dict(zip(pins, bits)), compute(*bits))
+                 for i, bits in enumerate(product((0, 1), repeat=len(pins)), 1))
+
+
+# AND truth table vectors, built once and shared by the suite tests. Suites
+# never change a vector's values, so each test just takes its own list.
+_AND_VECTORS = _truth_table_vectors(("a", "b"), lambda a, b: {"out": a & b})
+
+
 class TestChipModels(unittest.TestCase):
     """Test chip model classes."""
     
@@ -39,13 +47,11 @@ class TestChipModels(unittest.TestCase):
         self.assertEqual(pin.pin_type, PinType.INPUT)
         self.assertEqual(pin.value, 1)
         
-        # Invalid pin name
-        with self.assertRaises(ValueError):
-            Pin("", PinType.INPUT)
-        
-        # Invalid pin value
-        with self.assertRaises(ValueError):
-            Pin("test", PinType.INPUT, 2)
+        # Invalid pin names, invalid pin value
+        for args in (("", PinType.INPUT), ("  ", PinType.INPUT), (None, PinType.INPUT),
+                     (5, PinType.INPUT), ("test", PinType.INPUT, 2)):
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                Pin(*args)
     
     def test_connection_validation(self):
         """Test connection validation."""
@@ -55,11 +61,9 @@ class TestChipModels(unittest.TestCase):
         self.assertEqual(conn.target_pin, "target")
         
         # Invalid connections
-        with self.assertRaises(ValueError):
-            Connection("", "target")
-        
-        with self.assertRaises(ValueError):
-            Connection("source", "")
+        for args in (("", "target"), ("source", "")):
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                Connection(*args)
     
     def test_part_instance_validation(self):
         """Test part instance validation."""
@@ -73,47 +77,58 @@ class TestChipModels(unittest.TestCase):
         part2 = PartInstance("Nand", {"a": "input1", "b": "input2", "out": "output1"})
         self.assertEqual(part2.chip_type, "Nand")
         self.assertEqual(part2.instance_name, "nand1")  # Auto-generated
+        self.assertIn("instance_name='nand1'", repr(part2))
+        with self.assertRaises(AttributeError):
+            part2.instance_name = "n2"
         
         # Invalid part instances
-        with self.assertRaises(ValueError):
-            PartInstance("", {"a": "input1"})
-        
-        with self.assertRaises(ValueError):
-            PartInstance("And", {})
+        bad_cases = (
+            (PartInstance, ("", {"a": "input1"})),
+            (PartInstance, ("And", {})),
+        )
+        for make, args in bad_cases:
+            with self.subTest(make=make, args=args), self.assertRaises(ValueError):
+                make(*args)
     
     def test_chip_definition_validation(self):
         """Test chip definition validation."""
         # Valid chip definition
         chip = ChipDefinition("TestChip", ["a", "b"], ["out"])
         self.assertEqual(chip.name, "TestChip")
-        self.assertEqual(chip.inputs, ["a", "b"])
-        self.assertEqual(chip.outputs, ["out"])
+        self.assertEqual(chip.inputs, ("a", "b"))
+        self.assertEqual(chip.outputs, ("out",))
         self.assertEqual(chip.chip_type, ChipType.CUSTOM)
         
-        # Invalid chip definitions
-        with self.assertRaises(ValueError):
-            ChipDefinition("", ["a"], ["out"])  # Empty name
+        # Definitions are read-only, so the pin sets worked out above can't go stale
+        with self.assertRaises(AttributeError):
+            chip.inputs = ("a", "b", "c")
         
-        with self.assertRaises(ValueError):
-            ChipDefinition("TestChip", [], ["out"])  # No inputs
-        
-        with self.assertRaises(ValueError):
-            ChipDefinition("TestChip", ["a"], [])  # No outputs
-        
-        with self.assertRaises(ValueError):
-            ChipDefinition("TestChip", ["a", "a"], ["out"])  # Duplicate pins
+        # Invalid chip definitions
+        bad_cases = (
+            ("", ["a"], ["out"]),  # Empty name
+            ("TestChip", [], ["out"]),  # No inputs
+            ("TestChip", ["a"], []),  # No outputs
+            ("TestChip", ["a", "a"], ["out"]),  # Duplicate pins
+        )
+        for args in bad_cases:
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                ChipDefinition(*args)
     
     def test_chip_definition_properties(self):
         """Test chip definition properties."""
         parts = [PartInstance("Nand", {"a": "a", "b": "b", "out": "internal"}, "nand1")]
         chip = ChipDefinition("TestChip", ["a", "b"], ["out"], parts)
         
-        self.assertEqual(chip.all_pins, ["a", "b", "out"])
+        self.assertEqual(chip.all_pins, ("a", "b", "out"))
         self.assertFalse(chip.is_builtin)
         self.assertTrue(chip.is_composite)
         
         internal_signals = chip.get_internal_signals()
-        self.assertIn("internal", internal_signals)
+        self.assertEqual(internal_signals, {"internal"})
+        
+        # Both are worked out once when the chip is built
+        self.assertIs(chip.all_pins, chip.all_pins)
+        self.assertIs(chip.get_internal_signals(), internal_signals)
     
     def test_simulation_state(self):
         """Test simulation state management."""
@@ -132,6 +147,20 @@ class TestChipModels(unittest.TestCase):
         self.assertEqual(state.get_signal_value("a"), 1)
         self.assertEqual(state.get_signal_value("internal"), 0)
         self.assertIsNone(state.get_signal_value("nonexistent"))
+        
+        # Outputs are readable too, and clearing keeps only the inputs
+        state.set_output("out", 1)
+        self.assertEqual(state.get_signal_value("out"), 1)
+        state.clear_outputs_and_internals()
+        self.assertIsNone(state.get_signal_value("out"))
+        self.assertIsNone(state.get_signal_value("internal"))
+        self.assertEqual(state.get_signal_value("a"), 1)
+        
+        # Values written into the dicts directly are seen too
+        state.output_values["out"] = 0
+        state.input_values["b"] = 1
+        self.assertEqual(state.get_signal_value("out"), 0)
+        self.assertEqual(state.get_signal_value("b"), 1)
     
     def test_factory_functions(self):
         """Test factory functions for creating chip definitions."""
@@ -145,6 +174,7 @@ class TestChipModels(unittest.TestCase):
         custom = create_custom_chip_definition("And", ["a", "b"], ["out"], parts)
         self.assertEqual(custom.chip_type, ChipType.CUSTOM)
         self.assertFalse(custom.is_builtin)
+        self.assertEqual(custom.parts, tuple(parts))
 
 
 class TestTestModels(unittest.TestCase):
@@ -159,17 +189,15 @@ class TestTestModels(unittest.TestCase):
         self.assertEqual(len(vector.expected_outputs), 1)
         
         # Invalid test vectors
-        with self.assertRaises(ValueError):
-            TestVector("", {"a": 0}, {"out": 0})  # Empty ID
-        
-        with self.assertRaises(ValueError):
-            TestVector("test1", {}, {"out": 0})  # No inputs
-        
-        with self.assertRaises(ValueError):
-            TestVector("test1", {"a": 0}, {})  # No outputs
-        
-        with self.assertRaises(ValueError):
-            TestVector("test1", {"a": 2}, {"out": 0})  # Invalid input value
+        bad_cases = (
+            ("", {"a": 0}, {"out": 0}),  # Empty ID
+            ("test1", {}, {"out": 0}),  # No inputs
+            ("test1", {"a": 0}, {}),  # No outputs
+            ("test1", {"a": 2}, {"out": 0}),  # Invalid input value
+        )
+        for args in bad_cases:
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                TestVector(*args)
     
     def test_test_vector_properties(self):
         """Test test vector properties."""
@@ -181,11 +209,34 @@ class TestTestModels(unittest.TestCase):
         self.assertIn("out=0", vector.format_expected_outputs())
         self.assertIn("carry=1", vector.format_expected_outputs())
     
+    def test_packed_test_vector(self):
+        """Test packing a test vector into bitmasks."""
+        vector = TestVector("test1", {"a": 1, "b": 0, "sel": 1}, {"out": 1, "carry": 0})
+        packed = vector.to_packed(["a", "b", "sel"], ["out", "carry"])
+        
+        self.assertEqual(packed, BitPackedTestVector("test1", 0b101, 0b01))
+        self.assertEqual(packed.get_differences(0b01, ["out", "carry"]), {})
+        self.assertEqual(packed.get_differences(0b10, ["out", "carry"]), {
+            "out": {"expected": 1, "actual": 0},
+            "carry": {"expected": 0, "actual": 1}
+        })
+        
+        suite = TestSuite("Mux", [vector])
+        self.assertEqual(suite.to_packed(), [packed])
+    
     def test_test_result(self):
         """Test test result functionality."""
         vector = TestVector("test1", {"a": 0, "b": 1}, {"out": 0})
         result = TestResult(vector)
         
+        # Timestamp defaults to the creation time and is still a regular field
+        self.assertIsNotNone(result.timestamp)
+        self.assertLess(abs((datetime.now() - result.timestamp).total_seconds()), 5)
+        stamp = datetime(2025, 1, 1)
+        self.assertEqual(TestResult(vector, timestamp=stamp).timestamp, stamp)
+        self.assertIn("timestamp", [f.name for f in fields(result)])
+        self.assertEqual(replace(result).timestamp, result.timestamp)
+        
         # Initial state
         self.assertEqual(result.status, TestStatus.PENDING)
         self.assertFalse(result.passed)
@@ -209,6 +260,10 @@ class TestTestModels(unittest.TestCase):
         self.assertIn("out", differences)
         self.assertEqual(differences["out"]["expected"], 0)
         self.assertEqual(differences["out"]["actual"], 1)
+        self.assertEqual(result.get_difference_rows(), [("out", 0, 1)])
+        result.actual_outputs = {}
+        self.assertEqual(result.get_difference_rows(), [("out", 0, None)])
+        self.assertEqual(result.get_differences()["out"]["actual"], -1)
     
     def test_test_result_symbols(self):
         """Test test result status symbols."""
@@ -226,12 +281,7 @@ class TestTestModels(unittest.TestCase):
     
     def test_test_suite_validation(self):
         """Test test suite validation."""
-        vectors = [
-            TestVector("test1", {"a": 0, "b": 0}, {"out": 0}),
-            TestVector("test2", {"a": 0, "b": 1}, {"out": 0}),
-            TestVector("test3", {"a": 1, "b": 0}, {"out": 0}),
-            TestVector("test4", {"a": 1, "b": 1}, {"out": 1})
-        ]
+        vectors = list(_AND_VECTORS)
         
         # Valid test suite
         suite = TestSuite("And", vectors)
@@ -260,12 +310,7 @@ class TestTestModels(unittest.TestCase):
     
     def test_test_suite_filtering(self):
         """Test test suite filtering."""
-        vectors = [
-            TestVector("test1", {"a": 0, "b": 0}, {"out": 0}),
-            TestVector("test2", {"a": 0, "b": 1}, {"out": 0}),
-            TestVector("test3", {"a": 1, "b": 0}, {"out": 0}),
-            TestVector("test4", {"a": 1, "b": 1}, {"out": 1})
-        ]
+        vectors = list(_AND_VECTORS)
         
         suite = TestSuite("And", vectors)
         
@@ -278,6 +323,50 @@ class TestTestModels(unittest.TestCase):
         self.assertIsNotNone(test)
         self.assertEqual(test.inputs["a"], 1)
         self.assertEqual(test.inputs["b"], 0)
+        
+        # Repeated lookups and unknown IDs
+        self.assertIs(suite.get_test_by_id("test3"), test)
+        self.assertIsNone(suite.get_test_by_id("missing"))
+        self.assertIs(filtered.get_test_by_id("test4"), vectors[3])
+        self.assertIsNone(filtered.get_test_by_id("test1"))
+        
+        # Column-based filtering gives the same vectors as the predicate
+        self.assertEqual(suite.filter_by_input("a", 1).test_vectors, filtered.test_vectors)
+        self.assertEqual(suite.filter_by_input("b", 0).test_vectors, [vectors[0], vectors[2]])
+        with self.assertRaises(ValueError):
+            suite.filter_by_input("out", 1)
+    
+    def test_test_suite_from_rows(self):
+        """Test building a suite from value rows with one bulk check."""
+        suite = TestSuite.from_rows("And", ["a", "b"], ["out"],
+                                    [(0, 0), (0, 1), (1, 0), (1, 1)],
+                                    [(0,), (0,), (0,), (1,)])
+        
+        self.assertEqual(suite.test_count, 4)
+        self.assertEqual(suite.get_test_by_id("test4"),
+                         TestVector("test4", {"a": 1, "b": 1}, {"out": 1}))
+        
+        with self.assertRaises(ValueError):
+            TestSuite.from_rows("And", ["a", "b"], ["out"], [(0, 2)], [(0,)])
+        with self.assertRaises(ValueError):
+            TestSuite.from_rows("And", ["a", "b"], ["out"], [(0,)], [(0,)])
+        with self.assertRaises(ValueError):
+            TestSuite.from_rows("And", ["a", "b"], ["out"], [(0, 0)], [])
+    
+    def test_test_suite_interns_pin_names(self):
+        """Test that all vectors share the suite's pin name strings."""
+        suite = TestSuite.from_rows("Not", ["".join(["i", "n"])], ["".join(["o", "ut"])],
+                                    [(0,), (1,)], [(1,), (0,)])
+        
+        for vector in suite.test_vectors:
+            self.assertIs(next(iter(vector.inputs)), suite.input_pins[0])
+            self.assertIs(next(iter(vector.expected_outputs)), suite.output_pins[0])
+        
+        # Vectors built by callers keep the dicts they were given
+        inputs = {"".join(["i", "n"]): 0}
+        vector = TestVector("t1", inputs, {"out": 1})
+        TestSuite("Not", [vector])
+        self.assertIs(vector.inputs, inputs)
     
     def test_test_report(self):
         """Test test report functionality."""
@@ -302,10 +391,41 @@ class TestTestModels(unittest.TestCase):
         self.assertEqual(report.pass_rate, 100.0)
         self.assertTrue(report.all_passed)
         
+        # Counters only follow later status changes after a refresh
+        result.mark_failed("Output mismatch")
+        self.assertEqual(report.passed_tests, 1)
+        report.refresh_counters()
+        self.assertEqual(report.passed_tests, 0)
+        self.assertEqual(report.failed_tests, 1)
+        self.assertEqual(report.get_failed_results(), [result])
+        self.assertEqual(report.get_error_results(), [])
+        result.mark_passed()
+        report.refresh_counters()
+        
+        # Results appended to test_results directly are counted on the next read
+        errored = TestResult(vectors[0])
+        errored.mark_error("Simulation failed")
+        report.test_results.append(errored)
+        self.assertEqual(report.error_tests, 1)
+        self.assertEqual(report.pass_rate, 50.0)
+        
+        # Reported results and reports stay plain data
+        self.assertEqual(asdict(errored)["status"], TestStatus.ERROR)
+        self.assertEqual(len(asdict(report)["test_results"]), 2)
+        
         # Test report finishing
         report.finish()
         self.assertIsNotNone(report.end_time)
         self.assertIsNotNone(report.total_execution_time_ms)
+        self.assertAlmostEqual((report.end_time - report.start_time).total_seconds() * 1000,
+                               report.total_execution_time_ms, delta=0.01)
+        
+        # An explicit start time is measured against the wall clock
+        report = TestReport("Not", suite, start_time=datetime(2025, 1, 1))
+        report.finish()
+        self.assertGreater(report.total_execution_time_ms, 0)
+        self.assertEqual((report.end_time - report.start_time).total_seconds() * 1000,
+                         report.total_execution_time_ms)
     
     def test_report_serialization(self):
         """Test test report serialization."""
@@ -324,11 +444,18 @@ class TestTestModels(unittest.TestCase):
         self.assertIn("chip_name", summary)
         self.assertIn("total_tests", summary)
         self.assertIn("pass_rate", summary)
+        self.assertEqual(summary["end_time"], report.end_time.isoformat())
+        
+        # Times changed after finish() are formatted afresh
+        report.start_time = datetime(2025, 1, 1)
+        self.assertEqual(report.to_summary_dict()["start_time"], "2025-01-01T00:00:00")
         
         # Test detailed serialization
         detailed = report.to_detailed_dict()
         self.assertIn("test_results", detailed)
         self.assertIn("test_suite", detailed)
+        self.assertEqual(detailed["test_results"][0]["timestamp"],
+                         result.timestamp.isoformat())
     
     def test_factory_functions(self):
         """Test factory functions for test objects."""
@@ -354,11 +481,7 @@ class TestModelIntegration(unittest.TestCase):
         chip = ChipDefinition("And", ["a", "b"], ["out"], parts)
         
         # Create test vectors
-        vectors = [
-            TestVector("test1", {"a": 0, "b": 0}, {"out": 0}),
-            TestVector("test2", {"a": 1, "b": 1}, {"out": 1})
-        ]
-        suite = TestSuite("And", vectors)
+        suite = TestSuite("And", list(_AND_VECTORS))
         
         # Verify compatibility
         self.assertEqual(chip.name, suite.chip_name)